@@ -0,0 +1,69 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('email', sa.String(100), nullable=False),
+        sa.Column('password_hash', sa.String(255), nullable=False),
+        sa.Column('role', sa.String(20), nullable=False),
+    )
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'workouts',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('trainer_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+    )
+    op.create_index('ix_workouts_id', 'workouts', ['id'])
+
+    op.create_table(
+        'assignments',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('client_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('workout_id', sa.Integer(), sa.ForeignKey('workouts.id'), nullable=False),
+        sa.UniqueConstraint('client_id', 'workout_id', name='unique_client_workout'),
+    )
+    op.create_index('ix_assignments_id', 'assignments', ['id'])
+
+    op.create_table(
+        'progress_logs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('client_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=True),
+        sa.Column('calories', sa.Integer(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+    )
+    op.create_index('ix_progress_logs_id', 'progress_logs', ['id'])
+
+    op.create_table(
+        'health_tips',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+    )
+    op.create_index('ix_health_tips_id', 'health_tips', ['id'])
+
+def downgrade():
+    op.drop_table('health_tips')
+    op.drop_table('progress_logs')
+    op.drop_table('assignments')
+    op.drop_table('workouts')
+    op.drop_table('users')
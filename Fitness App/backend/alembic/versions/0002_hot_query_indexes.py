@@ -0,0 +1,32 @@
+"""indexes for the router query shapes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_users_role_id', 'users', ['role', 'id']),
+    ('ix_workouts_trainer_id_id', 'workouts', ['trainer_id', 'id']),
+    ('ix_assignments_workout_id', 'assignments', ['workout_id']),
+    ('ix_progress_logs_client_id_date_id', 'progress_logs', ['client_id', sa.text('date DESC'), sa.text('id DESC')]),
+    ('ix_progress_logs_date_id', 'progress_logs', [sa.text('date DESC'), sa.text('id DESC')]),
+]
+
+def upgrade():
+    # CONCURRENTLY keeps the tables writable while large indexes build
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""per-client progress rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'progress_rollups',
+        sa.Column('client_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('period', sa.String(10), primary_key=True),
+        sa.Column('period_start', sa.Date(), primary_key=True),
+        sa.Column('log_count', sa.Integer(), nullable=False),
+        sa.Column('weight_count', sa.Integer(), nullable=False),
+        sa.Column('weight_sum', sa.Float(), nullable=False),
+        sa.Column('calorie_sum', sa.BigInteger(), nullable=False),
+        sa.Column('latest_weight_date', sa.Date(), nullable=True),
+        sa.Column('latest_weight', sa.Float(), nullable=True),
+    )
+    # Backfill from the existing logs; see rollups.py for later rebuilds
+    for period in ('day', 'week'):
+        op.execute(f"""
+            INSERT INTO progress_rollups
+            SELECT client_id, '{period}', date_trunc('{period}', date::timestamp)::date,
+                   count(*), count(weight), coalesce(sum(weight), 0), coalesce(sum(calories), 0),
+                   max(date) FILTER (WHERE weight IS NOT NULL),
+                   (array_agg(weight ORDER BY date DESC, id DESC) FILTER (WHERE weight IS NOT NULL))[1]
+            FROM progress_logs
+            GROUP BY client_id, date_trunc('{period}', date::timestamp)::date
+        """)
+
+def downgrade():
+    op.drop_table('progress_rollups')
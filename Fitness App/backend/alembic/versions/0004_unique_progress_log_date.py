@@ -0,0 +1,40 @@
+"""one progress log per client per day
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00
+"""
+from alembic import op
+from alembic.util import CommandError
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# Duplicates listed in the error before it just gives the count
+SHOWN_DUPLICATES = 20
+
+def upgrade():
+    # Logs are user data: refuse to pick a winner and leave the merge to an operator
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT client_id, date, count(*) AS logs
+        FROM progress_logs
+        GROUP BY client_id, date
+        HAVING count(*) > 1
+        ORDER BY client_id, date
+    """)).fetchall()
+    if duplicates:
+        lines = [f"  client {row.client_id} on {row.date}: {row.logs} logs" for row in duplicates[:SHOWN_DUPLICATES]]
+        if len(duplicates) > SHOWN_DUPLICATES:
+            lines.append(f"  ... and {len(duplicates) - SHOWN_DUPLICATES} more")
+        raise CommandError(
+            f"{len(duplicates)} client/date pairs have more than one progress log:\n" + "\n".join(lines) +
+            "\nMerge or delete the extra logs, run `python rollups.py rebuild`, then upgrade again."
+        )
+    
+    op.create_unique_constraint('unique_client_date', 'progress_logs', ['client_id', 'date'])
+
+def downgrade():
+    op.drop_constraint('unique_client_date', 'progress_logs', type_='unique')
@@ -0,0 +1,38 @@
+"""full-text search vector on workouts
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 13:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+def upgrade():
+    # Adding a stored generated column rewrites the table once
+    op.add_column('workouts', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_workouts_search_vector', 'workouts', ['search_vector'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_workouts_search_vector', table_name='workouts',
+            postgresql_concurrently=True, if_exists=True
+        )
+    op.drop_column('workouts', 'search_vector')
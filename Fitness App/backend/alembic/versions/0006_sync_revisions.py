@@ -0,0 +1,82 @@
+"""change revisions and tombstones for delta sync
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 14:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+# pg_current_xact_id needs PostgreSQL 13 or newer
+CHANGE_REVISION = sa.text("(pg_current_xact_id()::text::bigint)")
+TABLES = ('workouts', 'assignments', 'progress_logs')
+
+def upgrade():
+    op.create_table(
+        'sync_tombstones',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('table_name', sa.String(50), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.Integer(), nullable=True),
+        sa.Column('trainer_id', sa.Integer(), nullable=True),
+        sa.Column('workout_id', sa.Integer(), nullable=True),
+        sa.Column('revision', sa.BigInteger(), nullable=False, server_default=CHANGE_REVISION),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_sync_tombstones_revision', 'sync_tombstones', ['revision'])
+
+    op.execute("""
+        CREATE FUNCTION bump_revision() RETURNS trigger AS $$
+        BEGIN
+            NEW.revision := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # Records who can see the deleted row, so /api/sync can scope deletes per user
+    op.execute("""
+        CREATE FUNCTION record_tombstone() RETURNS trigger AS $$
+        BEGIN
+            IF TG_TABLE_NAME = 'workouts' THEN
+                INSERT INTO sync_tombstones (table_name, row_id, trainer_id, workout_id)
+                VALUES (TG_TABLE_NAME, OLD.id, OLD.trainer_id, OLD.id);
+            ELSIF TG_TABLE_NAME = 'assignments' THEN
+                INSERT INTO sync_tombstones (table_name, row_id, client_id, trainer_id, workout_id)
+                VALUES (TG_TABLE_NAME, OLD.id, OLD.client_id,
+                        (SELECT trainer_id FROM workouts WHERE id = OLD.workout_id), OLD.workout_id);
+            ELSE
+                INSERT INTO sync_tombstones (table_name, row_id, client_id)
+                VALUES (TG_TABLE_NAME, OLD.id, OLD.client_id);
+            END IF;
+            RETURN OLD;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    for table in TABLES:
+        op.add_column(table, sa.Column('revision', sa.BigInteger(), nullable=False, server_default=CHANGE_REVISION))
+        op.create_index(f'ix_{table}_revision', table, ['revision'])
+        op.execute(f"""
+            CREATE TRIGGER {table}_bump_revision BEFORE UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION bump_revision()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_tombstone AFTER DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_tombstone()
+        """)
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.execute(f"DROP TRIGGER {table}_tombstone ON {table}")
+        op.execute(f"DROP TRIGGER {table}_bump_revision ON {table}")
+        op.drop_index(f'ix_{table}_revision', table_name=table)
+        op.drop_column(table, 'revision')
+    op.execute("DROP FUNCTION record_tombstone()")
+    op.execute("DROP FUNCTION bump_revision()")
+    op.drop_index('ix_sync_tombstones_revision', table_name='sync_tombstones')
+    op.drop_table('sync_tombstones')
@@ -0,0 +1,200 @@
+"""
+Response compression - gzip, plus brotli and zstd when their packages are installed, chosen from Accept-Encoding
+"""
+import functools
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from app.core import metrics
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Besides text/*; images, archives and the like are already compressed
+COMPRESSIBLE_TYPES = frozenset((
+    "application/json", "application/x-ndjson", "application/javascript", "application/xml", "image/svg+xml",
+))
+# Event streams must reach the client message by message
+NEVER_COMPRESS = frozenset(("text/event-stream",))
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip header and trailer
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        output = self._compressor.process(data)
+        return output + (self._compressor.finish() if final else self._compressor.flush())
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+def available_encoders() -> Dict[str, Callable[[], object]]:
+    """Content-coding -> encoder factory, for the codings whose libraries are installed"""
+    encoders = {"gzip": lambda: GzipEncoder(settings.COMPRESSION_GZIP_LEVEL)}
+    if brotli is not None:
+        encoders["br"] = lambda: BrotliEncoder(settings.COMPRESSION_BROTLI_QUALITY)
+    if zstandard is not None:
+        encoders["zstd"] = lambda: ZstdEncoder(settings.COMPRESSION_ZSTD_LEVEL)
+    return encoders
+
+ENCODERS = available_encoders()
+
+def _qualities(accept_encoding: str) -> Dict[str, float]:
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+@functools.lru_cache(maxsize=256)
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The client's highest-q coding we support, ties going to COMPRESSION_ENCODINGS order"""
+    qualities = _qualities(accept_encoding)
+    best, best_quality = None, 0.0
+    for coding in settings.COMPRESSION_ENCODINGS:
+        if coding not in ENCODERS:
+            continue
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+    if media_type in NEVER_COMPRESS:
+        return False
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+def _encoded_start(start: dict, coding: str, length: Optional[int]) -> dict:
+    headers = MutableHeaders(raw=list(start.get("headers", [])))
+    headers["Content-Encoding"] = coding
+    headers.add_vary_header("Accept-Encoding")
+    if length is None:
+        del headers["Content-Length"]
+    else:
+        headers["Content-Length"] = str(length)
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"  # the encoded bytes differ from the ones the strong tag named
+    return {**start, "headers": headers.raw}
+
+def _request_header(scope, name: bytes) -> str:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return ""
+
+@functools.lru_cache(maxsize=None)
+def _byte_counters(coding: str) -> Tuple[metrics.Counter, metrics.Counter]:
+    return metrics.counter("compression.bytes_in", encoding=coding), metrics.counter("compression.bytes_out", encoding=coding)
+
+class CompressionMiddleware:
+    """Compresses text and JSON responses of at least minimum_size bytes.
+
+    Streamed responses are compressed chunk by chunk and flushed after each
+    one, so clients still see every chunk as it is produced. Chunks of
+    thread_size bytes or more are compressed in the threadpool - zlib, brotli
+    and zstd release the GIL - to keep large bodies from stalling the event loop.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, thread_size: int = 64 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        coding = choose_encoding(_request_header(scope, b"accept-encoding"))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[dict] = None
+        encoder = None
+        passthrough = False
+        bytes_in, bytes_out = _byte_counters(coding)
+
+        async def send_compressed(message):
+            nonlocal start, encoder, passthrough
+            if passthrough or message["type"] not in ("http.response.start", "http.response.body"):
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if _compressible(Headers(raw=message.get("headers", []))):
+                    start = message  # held until the first body chunk shows the size
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            body, more = message.get("body", b""), message.get("more_body", False)
+            if encoder is None and not more:
+                # The whole body in one message: compress it only if that is worth it
+                passthrough = True
+                if len(body) < self.minimum_size:
+                    await send(start)
+                    await send(message)
+                    return
+                compressed = await self._compress(ENCODERS[coding](), body, True)
+                if len(compressed) >= len(body):
+                    await send(start)
+                    await send(message)
+                    return
+                bytes_in.inc(len(body))
+                bytes_out.inc(len(compressed))
+                await send(_encoded_start(start, coding, len(compressed)))
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            if encoder is None:
+                encoder = ENCODERS[coding]()
+                await send(_encoded_start(start, coding, None))
+            if not body and more:
+                return  # nothing to flush
+            compressed = await self._compress(encoder, body, not more)
+            bytes_in.inc(len(body))
+            bytes_out.inc(len(compressed))
+            await send({"type": "http.response.body", "body": compressed, "more_body": more})
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _compress(self, encoder, data: bytes, final: bool) -> bytes:
+        if len(data) >= self.thread_size:
+            return await run_in_threadpool(encoder.compress, data, final)
+        return encoder.compress(data, final)
@@ -0,0 +1,113 @@
+"""
+Change notifications - an in-process pub/sub bus feeding the per-user event streams
+"""
+import asyncio
+from typing import Dict, Iterable, NamedTuple, Optional, Set
+from app.core import metrics
+from app.core.config import settings
+
+class Event(NamedTuple):
+    type: str  # e.g. "progress_log.created"
+    data: dict
+
+# Sent in place of the backlog when a subscriber falls too far behind
+RESYNC = Event("resync", {})
+
+class Subscription:
+    """Bounded queue of events for one connection"""
+
+    def __init__(self, bus: "InProcessEventBus", channel: str):
+        self.bus = bus
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+
+    def offer(self, event: Event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog rather than grow; the client refetches via /api/sync
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            metrics.counter("events.dropped").inc()
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """Next event, or None if nothing arrived within timeout seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+class SubscriberLimitReached(Exception):
+    pass
+
+class InProcessEventBus:
+    """Fan-out to subscribers of this worker only.
+
+    A bus shared between workers (Redis, Postgres LISTEN/NOTIFY) can replace it
+    through set_bus, as long as it offers the same publish/subscribe/unsubscribe
+    and has_capacity.
+    """
+
+    def __init__(self, max_subscribers: int):
+        self.max_subscribers = max_subscribers
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+
+    async def publish(self, channel: str, event: Event):
+        for subscription in list(self._channels.get(channel, ())):
+            subscription.offer(event)
+        metrics.counter("events.published").inc()
+
+    def has_capacity(self) -> bool:
+        return self._count < self.max_subscribers
+
+    def subscribe(self, channel: str) -> Subscription:
+        if not self.has_capacity():
+            raise SubscriberLimitReached()
+        subscription = Subscription(self, channel)
+        self._channels.setdefault(channel, set()).add(subscription)
+        self._count += 1
+        metrics.gauge("events.subscribers").set(self._count)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._channels.get(subscription.channel)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._channels[subscription.channel]
+        self._count -= 1
+        metrics.gauge("events.subscribers").set(self._count)
+
+_bus = InProcessEventBus(settings.EVENTS_MAX_SUBSCRIBERS)
+
+def get_bus():
+    return _bus
+
+def set_bus(bus):
+    global _bus
+    _bus = bus
+
+def trainer_channel(trainer_id: int) -> str:
+    return f"trainer:{trainer_id}"
+
+def client_channel(client_id: int) -> str:
+    return f"client:{client_id}"
+
+async def notify(
+    event_type: str,
+    data: dict,
+    trainer_ids: Iterable[int] = (),
+    client_ids: Iterable[int] = ()
+):
+    """Publish one change to every trainer and client it concerns; call after commit"""
+    event = Event(event_type, data)
+    channels = {trainer_channel(trainer_id) for trainer_id in trainer_ids}
+    channels.update(client_channel(client_id) for client_id in client_ids)
+    for channel in channels:
+        await _bus.publish(channel, event)
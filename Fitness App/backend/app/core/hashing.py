@@ -0,0 +1,85 @@
+"""
+bcrypt on a bounded process pool - keeps password hashing off the event loop and request threads
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import bcrypt
+from fastapi import HTTPException, status
+from app.core import metrics
+from app.core.config import settings
+
+hash_latency = metrics.latency("bcrypt.hash")
+verify_latency = metrics.latency("bcrypt.verify")
+pending_gauge = metrics.gauge("bcrypt.pending")
+rejected = metrics.counter("bcrypt.rejected")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_pending = 0
+
+class PasswordHasherBusy(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress, please retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+def _verify(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn avoids forking a process that already holds threads and sockets
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.BCRYPT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+async def _run(latency: metrics.Latency, fn, *args):
+    global _pending
+    if _pending >= settings.BCRYPT_MAX_PENDING:
+        rejected.inc()
+        raise PasswordHasherBusy()
+    
+    _pending += 1
+    pending_gauge.set(_pending)
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+    finally:
+        latency.observe(time.perf_counter() - start)
+        _pending -= 1
+        pending_gauge.set(_pending)
+
+async def hash_password(password: str) -> str:
+    hashed = await _run(hash_latency, _hash, password.encode('utf-8'), settings.BCRYPT_ROUNDS)
+    return hashed.decode('utf-8')
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await _run(verify_latency, _verify, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def hash_password_blocking(password: str) -> str:
+    """Hash in the calling thread, for the CLIs - they have no event loop to keep free"""
+    return _hash(password.encode('utf-8'), settings.BCRYPT_ROUNDS).decode('utf-8')
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when the stored hash was made with a different cost than BCRYPT_ROUNDS"""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.BCRYPT_ROUNDS
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,119 @@
+"""
+In-process metrics - counters, gauges and latency histograms, served as JSON by
+/api/internal/metrics and in Prometheus format by /metrics (app.core.prometheus)
+"""
+import bisect
+import threading
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Counter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+    
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+    
+    def snapshot(self) -> int:
+        return self.value
+
+class Gauge:
+    def __init__(self):
+        self.value = 0
+    
+    def set(self, value: float):
+        self.value = value
+    
+    # Unlocked: only for gauges updated from the event loop thread
+    def inc(self, amount: float = 1):
+        self.value += amount
+    
+    def dec(self, amount: float = 1):
+        self.value -= amount
+    
+    def snapshot(self) -> float:
+        return self.value
+
+class Latency:
+    """Count, sum, max and cumulative bucket counts of durations in seconds"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+    
+    def observe(self, seconds: float):
+        index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+            self.buckets[index] += 1
+    
+    def state(self) -> Tuple[int, float, List[int]]:
+        """Count, sum and per-bucket (not cumulative) counts"""
+        with self._lock:
+            return self.count, self.total, list(self.buckets)
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, hits in zip(LATENCY_BUCKETS + (float("inf"),), self.buckets):
+                cumulative += hits
+                buckets[f"le_{bound}"] = cumulative
+            return {
+                "count": self.count,
+                "avg_seconds": self.total / self.count if self.count else 0.0,
+                "max_seconds": self.max,
+                "buckets": buckets,
+            }
+
+Metric = Union[Counter, Gauge, Latency]
+Labels = Tuple[Tuple[str, str], ...]
+
+# (name, sorted label pairs) -> metric
+_registry: Dict[Tuple[str, Labels], Metric] = {}
+_registry_lock = threading.Lock()
+_collectors: List[Callable[[], None]] = []
+
+def _get_or_create(name: str, kind, labels: dict):
+    key = (name, tuple(sorted(labels.items())) if labels else ())
+    metric = _registry.get(key)
+    if metric is None:
+        with _registry_lock:
+            metric = _registry.setdefault(key, kind())
+    return metric
+
+def counter(name: str, **labels: str) -> Counter:
+    return _get_or_create(name, Counter, labels)
+
+def gauge(name: str, **labels: str) -> Gauge:
+    return _get_or_create(name, Gauge, labels)
+
+def latency(name: str, **labels: str) -> Latency:
+    return _get_or_create(name, Latency, labels)
+
+def add_collector(collect: Callable[[], None]):
+    """Register a function that refreshes gauges just before they are read, e.g. pool usage"""
+    _collectors.append(collect)
+
+def collect() -> Iterator[Tuple[str, Labels, Metric]]:
+    for refresh in _collectors:
+        refresh()
+    with _registry_lock:
+        entries = sorted(_registry.items(), key=lambda item: item[0])
+    for (name, labels), metric in entries:
+        yield name, labels, metric
+
+def _key(name: str, labels: Labels) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{label}={value}" for label, value in labels) + "}"
+
+def snapshot() -> dict:
+    return {_key(name, labels): metric.snapshot() for name, labels, metric in collect()}
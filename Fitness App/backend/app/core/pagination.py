@@ -0,0 +1,71 @@
+"""
+Keyset pagination helpers - opaque cursors and page assembly
+"""
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Any, Callable, List, Optional, Sequence
+from fastapi import HTTPException, Query, status
+from app.core.config import settings
+
+def page_limit(
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, description="Page size")
+) -> int:
+    """Requested page size, capped at the server-side maximum"""
+    return min(limit, settings.MAX_PAGE_SIZE)
+
+# Cursor value converters: anything a client can put in a cursor must be rejected
+# here, not by Postgres. ValueError becomes the 400 in decode_cursor.
+def _integer(bits: int) -> Callable[[Any], int]:
+    low, high = -2 ** (bits - 1), 2 ** (bits - 1) - 1
+
+    def convert(value: Any) -> int:
+        if type(value) is not int or not low <= value <= high:  # bool is an int subclass
+            raise ValueError("cursor value is not an integer in range")
+        return value
+    return convert
+
+row_id = _integer(32)  # integer primary keys
+big_row_id = _integer(64)  # bigint primary keys
+revision = _integer(64)  # bigint change revisions
+
+def iso_date(value: Any) -> date:
+    if type(value) is not str:
+        raise ValueError("cursor value is not a date")
+    return date.fromisoformat(value)
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort key of the last row as an opaque cursor"""
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode(cursor: str, shape: Callable[[int], Optional[Sequence[Callable[[Any], Any]]]]) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        types = shape(len(values)) if isinstance(values, list) else None
+        if types is None:
+            raise ValueError("cursor has the wrong shape")
+        return [convert(value) for convert, value in zip(types, values)]
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> List[Any]:
+    """Decode a cursor, converting each sort key value with the matching converter"""
+    return _decode(cursor, lambda length: types if length == len(types) else None)
+
+def decode_cursor_shapes(cursor: str, *shapes: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    """Decode a cursor that comes in several shapes, told apart by their length"""
+    return _decode(cursor, {len(shape): shape for shape in shapes}.get)
+
+def build_page(rows: List[Any], limit: int, key: Callable[[Any], List[Any]]) -> dict:
+    """Turn limit + 1 fetched rows into a page, emitting a cursor if more remain"""
+    next_cursor: Optional[str] = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(key(rows[-1]))
+    return {"items": rows, "next_cursor": next_cursor}
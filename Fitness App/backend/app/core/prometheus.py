@@ -0,0 +1,160 @@
+"""
+Prometheus exposition - renders app.core.metrics in the text format, summed across worker processes.
+
+With METRICS_MULTIPROC_DIR set, every worker writes its metrics to <dir>/<pid>.json
+each METRICS_FLUSH_SECONDS, and whichever worker serves /metrics adds them all up.
+Counters and histograms of exited workers keep counting towards the totals so they
+never go backwards; gauges only count while their worker keeps flushing. Empty the
+directory when the server starts, as with prometheus_client's multiprocess mode.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from app.core import metrics
+from app.core.config import settings
+
+PREFIX = "fitsphere_"
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette adds the charset
+
+def dump() -> dict:
+    """This process's metrics in the multiprocess file format"""
+    counters, gauges, histograms = [], [], []
+    for name, labels, metric in metrics.collect():
+        if isinstance(metric, metrics.Counter):
+            counters.append([name, labels, metric.value])
+        elif isinstance(metric, metrics.Gauge):
+            gauges.append([name, labels, metric.value])
+        else:
+            count, total, buckets = metric.state()
+            histograms.append([name, labels, count, total, buckets])
+    return {"pid": os.getpid(), "counters": counters, "gauges": gauges, "histograms": histograms}
+
+def _path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"{pid}.json")
+
+def flush():
+    directory = settings.METRICS_MULTIPROC_DIR
+    path = _path(directory, os.getpid())
+    temporary = f"{path}.{threading.get_ident()}.tmp"  # /metrics flushes from the threadpool
+    with open(temporary, "w") as file:
+        json.dump(dump(), file)
+    os.replace(temporary, path)
+
+def _worker_dumps() -> List[Tuple[dict, bool]]:
+    """Every worker's last dump and whether that worker is still flushing"""
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return [(dump(), True)]
+
+    flush()  # our own numbers as of now
+    stale_before = time.time() - 3 * settings.METRICS_FLUSH_SECONDS
+    dumps = []
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            with open(entry.path) as file:
+                dumps.append((json.load(file), entry.stat().st_mtime >= stale_before))
+        except (OSError, ValueError):
+            continue  # replaced or removed while we read it
+    return dumps
+
+def aggregate() -> Dict[str, dict]:
+    totals: Dict[str, dict] = {"counters": defaultdict(float), "gauges": defaultdict(float), "histograms": {}}
+    for data, live in _worker_dumps():
+        for name, labels, value in data["counters"]:
+            totals["counters"][(name, tuple(map(tuple, labels)))] += value
+        if live:
+            for name, labels, value in data["gauges"]:
+                totals["gauges"][(name, tuple(map(tuple, labels)))] += value
+        for name, labels, count, total, buckets in data["histograms"]:
+            series = (name, tuple(map(tuple, labels)))
+            current = totals["histograms"].setdefault(series, [0, 0.0, [0] * len(buckets)])
+            current[0] += count
+            current[1] += total
+            current[2] = [a + b for a, b in zip(current[2], buckets)]
+    return totals
+
+def _metric_name(name: str, suffix: str = "") -> str:
+    base = PREFIX + name.replace(".", "_")
+    return base if not suffix or base.endswith(suffix) else base + suffix
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels: metrics.Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in pairs) + "}"
+
+def _format(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+def render() -> str:
+    totals = aggregate()
+    lines: List[str] = []
+
+    def family(kind: str, series: dict, suffix: str, write):
+        names = {}
+        for (name, labels), value in sorted(series.items()):
+            names.setdefault(name, []).append((labels, value))
+        for name, members in names.items():
+            metric = _metric_name(name, suffix)
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in members:
+                write(metric, labels, value)
+
+    family("counter", totals["counters"], "_total",
+           lambda metric, labels, value: lines.append(f"{metric}{_labels(labels)} {_format(value)}"))
+    family("gauge", totals["gauges"], "",
+           lambda metric, labels, value: lines.append(f"{metric}{_labels(labels)} {_format(value)}"))
+
+    def histogram(metric: str, labels, value):
+        count, total, buckets = value
+        cumulative = 0
+        for bound, hits in zip(metrics.LATENCY_BUCKETS + (float("inf"),), buckets):
+            cumulative += hits
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{metric}_bucket{_labels(labels, ('le', le))} {cumulative}")
+        lines.append(f"{metric}_sum{_labels(labels)} {repr(float(total))}")
+        lines.append(f"{metric}_count{_labels(labels)} {count}")
+    family("histogram", totals["histograms"], "_seconds", histogram)
+
+    # Hit ratios need the summed counters, so they are derived here rather than recorded
+    hits = {labels: value for (name, labels), value in totals["counters"].items() if name == "cache.hits"}
+    misses = {labels: value for (name, labels), value in totals["counters"].items() if name == "cache.misses"}
+    if hits:
+        lines.append(f"# TYPE {PREFIX}cache_hit_ratio gauge")
+        for labels in sorted(hits):
+            lookups = hits[labels] + misses.get(labels, 0)
+            ratio = hits[labels] / lookups if lookups else 0.0
+            lines.append(f"{PREFIX}cache_hit_ratio{_labels(labels)} {_format(ratio)}")
+    return "\n".join(lines) + "\n"
+
+_task: Optional[asyncio.Task] = None
+
+async def _flush_forever():
+    while True:
+        await asyncio.sleep(settings.METRICS_FLUSH_SECONDS)
+        flush()
+
+def start():
+    """Begin writing this worker's metrics for the others to aggregate"""
+    global _task
+    if settings.METRICS_MULTIPROC_DIR and _task is None:
+        os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+        flush()
+        _task = asyncio.create_task(_flush_forever())
+
+def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
+        flush()  # final counts, kept for the totals after this worker exits
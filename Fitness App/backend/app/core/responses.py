@@ -0,0 +1,14 @@
+"""
+JSON responses - orjson encoding plus a fast path for payloads built from selected columns
+"""
+from typing import Any, Optional
+from fastapi.responses import ORJSONResponse
+
+def trusted_json(content: Any, status_code: int = 200, headers: Optional[dict] = None) -> ORJSONResponse:
+    """Encode content directly, skipping the route's response_model validation.
+    
+    Returning a Response makes FastAPI bypass the model, so only pass data whose
+    shape the route already guarantees - dicts from explicitly selected columns.
+    ORM objects still go through the model, which filters fields like password_hash.
+    """
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
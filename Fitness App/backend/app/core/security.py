@@ -1,23 +1,77 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional
+import time
 from jose import JWTError, jwt
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
 from app.db.database import get_db
 from app.models.models import User
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 security = HTTPBearer()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+class CurrentUser(NamedTuple):
+    """Cached snapshot of the authenticated user, detached from any session"""
+    id: int
+    name: str
+    email: str
+    role: str
 
-def get_password_hash(password: str) -> str:
-    salt = bcrypt.gensalt(rounds=12)
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+# token -> user id, and user id -> CurrentUser. Entries expire after AUTH_CACHE_TTL
+# seconds, which also bounds staleness for changes made by other workers:
+# invalidation only reaches this worker's caches.
+token_cache = TTLCache("auth_tokens", maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+user_cache = TTLCache("auth_users", maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+
+# Invalidations so far, and user id -> the count its last invalidation reached. A
+# user loaded before its invalidation may hold the old row, so cache_user leaves it
+# out. Markers expire with the cached users: a load that outlives its marker can at
+# worst cache the old row for AUTH_CACHE_TTL, the staleness other workers allow anyway.
+_invalidations = 0
+_invalidated_at = TTLCache("auth_invalidations", maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL)
+_CHANGED_USERS = "changed_user_ids"  # Session.info key
+
+def invalidation_count() -> int:
+    """Take before loading a user and pass to cache_user"""
+    return _invalidations
+
+def invalidate_user(user_id: int):
+    """Drop a cached user so the next request re-reads its role.
+    
+    Only this worker forgets it; other workers serve the old copy for up to AUTH_CACHE_TTL seconds.
+    """
+    global _invalidations
+    _invalidations += 1
+    _invalidated_at.set(user_id, _invalidations)
+    user_cache.pop(user_id)
+
+def invalidate_token(token: str):
+    token_cache.pop(token)
+
+# Flush-time events fire before the commit, while other requests can still read
+# the old row and cache it again - so collect the ids and invalidate once committed
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_user(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        invalidate_user(target.id)
+        return
+    session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        invalidate_user(user_id)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_users(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_CHANGED_USERS, None)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -29,7 +83,30 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
+def cache_user(user: User, loaded_after: Optional[int] = None) -> CurrentUser:
+    """Snapshot a user, caching it unless it was invalidated since invalidation_count() returned loaded_after"""
+    current_user = CurrentUser(id=user.id, name=user.name, email=user.email, role=user.role)
+    if loaded_after is None or _invalidated_at.get(user.id, 0) <= loaded_after:
+        user_cache.set(user.id, current_user)
+    return current_user
+
+def _decode_user_id(token: str) -> int:
+    """User id from a verified token, cached until the token or cache entry expires"""
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    sub = payload.get("sub")
+    if sub is None:
+        raise JWTError("Token has no subject")
+    user_id = int(sub)
+    ttl = settings.AUTH_CACHE_TTL
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    token_cache.set(token, user_id, ttl=ttl)
+    return user_id
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_db)) -> CurrentUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -41,18 +118,20 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         token = credentials.credentials
         if not token:
             raise credentials_exception
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except (JWTError, AttributeError, TypeError) as e:
+        user_id = _decode_user_id(token)
+    except (JWTError, AttributeError, TypeError, ValueError) as e:
         raise credentials_exception
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-    return user
+    
+    current_user = user_cache.get(user_id)
+    if current_user is None:
+        loaded_after = invalidation_count()
+        user = await db.get(User, user_id)
+        if user is None:
+            raise credentials_exception
+        current_user = cache_user(user, loaded_after)
+    return current_user
 
-def get_current_trainer(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_trainer(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     if current_user.role != "trainer" and current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -60,7 +139,7 @@ def get_current_trainer(current_user: User = Depends(get_current_user)) -> User:
         )
     return current_user
 
-def get_current_client(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_client(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     if current_user.role != "client":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -68,7 +147,7 @@ def get_current_client(current_user: User = Depends(get_current_user)) -> User:
         )
     return current_user
 
-def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_admin(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
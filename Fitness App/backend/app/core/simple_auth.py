@@ -2,13 +2,13 @@
 Simple authentication - no JWT tokens, just user lookup
 """
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.models import User
 
-def get_user_by_id(user_id: int, db: Session) -> User:
+async def get_user_by_id(user_id: int, db: AsyncSession) -> User:
     """Get user by ID - simple lookup, no token needed"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -16,9 +16,9 @@ def get_user_by_id(user_id: int, db: Session) -> User:
         )
     return user
 
-def get_user_by_email(email: str, db: Session) -> User:
+async def get_user_by_email(email: str, db: AsyncSession) -> User:
     """Get user by email"""
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).where(User.email == email))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
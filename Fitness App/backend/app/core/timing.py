@@ -0,0 +1,120 @@
+"""
+Per-request timing - query counts and database time for the Server-Timing header and
+query budgets, plus the request latency and status metrics exported at /metrics
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+in_flight = metrics.gauge("http.in_flight")
+# Anything else is counted as OTHER, so junk methods can't add label values
+KNOWN_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+class RequestStats:
+    """Queries run on behalf of one request, including tasks it spawned"""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+# Tasks and SQLAlchemy's greenlets inherit the context, so they share the request's object
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+def record_query(seconds: float):
+    """Called by the engine hooks in app.db.pool after each statement"""
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += seconds
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+def route_name(scope) -> str:
+    """'GET /api/workouts/{workout_id}' - the matched route template, or the raw path"""
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else scope['path']}"
+
+def query_budget(name: str) -> Optional[int]:
+    if name in settings.QUERY_BUDGETS:
+        return settings.QUERY_BUDGETS[name]
+    return settings.QUERY_BUDGET
+
+def check_query_budget(name: str, stats: RequestStats):
+    budget = query_budget(name)
+    if budget is None or stats.queries <= budget:
+        return
+    metrics.counter("db.query_budget_exceeded").inc()
+    message = f"{name} ran {stats.queries} queries, over its budget of {budget}"
+    if settings.QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+# (method, route template, status) -> its latency and count, skipping the registry lookups
+_request_metrics: Dict[Tuple[str, str, int], Tuple[metrics.Latency, metrics.Counter]] = {}
+
+def record_request(scope, status: int, seconds: float):
+    """Latency by route template and a count by status; unmatched paths share one label"""
+    route = scope.get("route")
+    template = route.path if route is not None else "unmatched"
+    method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+    key = (method, template, status)
+    pair = _request_metrics.get(key)
+    if pair is None:
+        pair = _request_metrics[key] = (
+            metrics.latency("http.request_duration", method=method, route=template),
+            metrics.counter("http.requests", method=method, route=template, status=str(status)),
+        )
+    pair[0].observe(seconds)
+    pair[1].inc()
+
+class RequestTimingMiddleware:
+    """Adds Server-Timing: db;dur=..;desc="N queries", app;dur=.., enforces query
+    budgets and records the request metrics.
+
+    The header goes out with the response start, so a streamed body's later
+    queries are not in it; the budget check runs after the body and counts them all.
+    """
+
+    def __init__(self, app, header: bool = True):
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500  # unless a response starts
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            if self.header and message["type"] == "http.response.start":
+                db_ms = stats.db_seconds * 1000
+                app_ms = max((time.perf_counter() - started) * 1000 - db_ms, 0.0)
+                value = f'db;dur={db_ms:.1f};desc="{stats.queries} queries", app;dur={app_ms:.1f}'
+                message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", value.encode())]}
+            await send(message)
+
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            in_flight.dec()
+            record_request(scope, status, time.perf_counter() - started)
+        check_query_budget(route_name(scope), stats)
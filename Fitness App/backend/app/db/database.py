@@ -1,17 +1,61 @@
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from app.core import metrics
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool, instrument_engine, pool_status
+from app.db.replicas import ReplicaSet
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+POOL_OPTIONS = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+# Synchronous engine for the seed and rollup CLIs and the benchmarks' dataset lookups
+engine = create_engine(settings.DATABASE_URL, pool_pre_ping=settings.DB_POOL_PRE_PING)
+
+# Async engine used by the API routes
+async_engine = create_async_engine(
+    settings.async_database_url,
+    poolclass=InstrumentedAsyncQueuePool,
+    **POOL_OPTIONS
+)
+instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Optional read-only copies for GET routes; health checks start with the app
+read_replicas = ReplicaSet(settings.async_read_replica_urls, POOL_OPTIONS, settings.REPLICA_MAX_LAG_SECONDS)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
+def get_read_sessionmaker(request: Request) -> async_sessionmaker:
+    """For read-only routes that open several sessions: one server for the whole request"""
+    return read_replicas.sessionmaker_for(request, AsyncSessionLocal)
+
+async def get_read_db(request: Request):
+    """Session for read-only routes: a healthy replica, or the primary just after this client wrote"""
+    async with get_read_sessionmaker(request)() as db:
+        yield db
+
+def get_pool_status() -> dict:
+    return pool_status(async_engine.pool, settings.DB_MAX_OVERFLOW)
+
+POOL_GAUGES = ("size", "max_overflow", "checked_out", "idle", "overflow")
+
+def _collect_pool_usage():
+    """Pool usage as gauges labelled by pool, refreshed whenever metrics are read"""
+    pools = [("primary", get_pool_status())]
+    pools += [(replica["url"], replica["pool"]) for replica in read_replicas.status()]
+    for name, status in pools:
+        for field in POOL_GAUGES:
+            metrics.gauge(f"db_pool.{field}", pool=name).set(status[field])
+
+metrics.add_collector(_collect_pool_usage)
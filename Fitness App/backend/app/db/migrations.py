@@ -0,0 +1,12 @@
+"""
+Apply Alembic migrations from Python (used by the seed scripts)
+"""
+import os
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini"))
+
+def upgrade_database(revision: str = "head"):
+    """Bring the schema up to the given revision"""
+    command.upgrade(Config(ALEMBIC_INI), revision)
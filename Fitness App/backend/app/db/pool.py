@@ -0,0 +1,62 @@
+"""
+Connection pool instrumentation - checkout wait time, saturation and connection errors
+"""
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core import metrics, timing
+
+checkout_wait = metrics.latency("db_pool.checkout_wait")
+checkout_timeouts = metrics.counter("db_pool.checkout_timeouts")
+connection_errors = metrics.counter("db_pool.connection_errors")
+queries = metrics.counter("db.queries")
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited"""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            checkout_timeouts.inc()
+            raise
+        except Exception:
+            # Opening a new connection failed
+            connection_errors.inc()
+            raise
+        finally:
+            checkout_wait.observe(time.perf_counter() - start)
+
+def _on_error(context):
+    # Connections dropped mid-use, e.g. by a Postgres restart
+    if context.is_disconnect and context.connection is not None:
+        connection_errors.inc()
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    queries.inc()
+    # One statement at a time per connection, so a single slot is enough
+    conn.info["query_started"] = time.perf_counter()
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is not None:
+        timing.record_query(time.perf_counter() - started)
+
+def instrument_engine(sync_engine):
+    event.listen(sync_engine, "handle_error", _on_error)
+    event.listen(sync_engine, "before_cursor_execute", _before_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_execute)
+
+def pool_status(pool, max_overflow: int) -> dict:
+    capacity = pool.size() + max_overflow
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "max_overflow": max_overflow,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": checked_out / capacity if capacity else 0.0,
+    }
@@ -0,0 +1,127 @@
+"""
+Read replicas - round-robin routing for read-only routes, lag-aware health checks and read-your-writes stickiness
+"""
+import asyncio
+import itertools
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.core import metrics
+from app.db.pool import InstrumentedAsyncQueuePool, instrument_engine, pool_status
+
+# Set after a successful write; while present, get_read_db uses the primary
+PRIMARY_COOKIE = "fitsphere_primary"
+MUTATING_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+# Seconds of replay delay. Zero when the standby has replayed everything it
+# received, and on a database that is not a standby at all.
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_is_in_recovery() AND pg_last_wal_receive_lsn() IS DISTINCT FROM pg_last_wal_replay_lsn()
+        THEN coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+        ELSE 0
+    END
+""")
+
+class Replica:
+    def __init__(self, url: str, pool_options: dict):
+        self.engine = create_async_engine(url, poolclass=InstrumentedAsyncQueuePool, **pool_options)
+        instrument_engine(self.engine.sync_engine)
+        self.sessionmaker = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+        self.max_overflow = pool_options.get("max_overflow", 0)
+        self.healthy = True  # until the first check says otherwise
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def status(self) -> dict:
+        return {
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "error": self.error,
+            "pool": pool_status(self.engine.pool, self.max_overflow),
+        }
+
+class ReplicaSet:
+    """Hands out healthy replicas in turn; with none configured or healthy, callers use the primary"""
+
+    def __init__(self, urls: List[str], pool_options: dict, max_lag: float):
+        self.replicas = [Replica(url, pool_options) for url in urls]
+        self.max_lag = max_lag
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[Replica]:
+        count = len(self.replicas)
+        start = next(self._turn)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if replica.healthy:
+                return replica
+        return None
+
+    def sessionmaker_for(self, request, primary: async_sessionmaker) -> async_sessionmaker:
+        """Sessions for a read-only request: the primary's just after this client wrote, else a healthy replica's"""
+        replica = None if PRIMARY_COOKIE in request.cookies else self.choose()
+        return replica.sessionmaker if replica else primary
+
+    async def check(self, timeout: float):
+        await asyncio.gather(*(self._check(replica, timeout) for replica in self.replicas))
+        metrics.gauge("db_replicas.healthy").set(sum(replica.healthy for replica in self.replicas))
+
+    async def _check(self, replica: Replica, timeout: float):
+        async def probe() -> float:
+            async with replica.engine.connect() as connection:
+                return float(await connection.scalar(LAG_QUERY))
+        try:
+            replica.lag = await asyncio.wait_for(probe(), timeout)
+        except Exception as exc:
+            replica.healthy, replica.lag, replica.error = False, None, repr(exc)
+            metrics.counter("db_replicas.failed_checks").inc()
+            return
+        replica.healthy = replica.lag <= self.max_lag
+        replica.error = None if replica.healthy else "replication lag"
+
+    async def start(self, interval: float):
+        """Check once so routing starts from real state, then keep checking in the background"""
+        if not self.replicas or self._task is not None:
+            return
+        await self.check(timeout=interval)
+        self._task = asyncio.create_task(self._check_forever(interval))
+
+    async def _check_forever(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.check(timeout=interval)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def status(self) -> List[dict]:
+        return [replica.status() for replica in self.replicas]
+
+class ReadYourWritesMiddleware:
+    """Sets PRIMARY_COOKIE on successful writes, so the writer's next reads see them.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streamed responses pass straight through.
+    """
+
+    def __init__(self, app, seconds: int):
+        self.app = app
+        self.cookie = f"{PRIMARY_COOKIE}=1; Max-Age={seconds}; Path=/; HttpOnly; SameSite=Lax".encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message = {**message, "headers": [*message.get("headers", ()), (b"set-cookie", self.cookie)]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -0,0 +1,140 @@
+"""
+Progress rollups - per-client day/week buckets kept current by recomputing only the buckets a write touches.
+Writers take a per-client advisory lock first, so each recompute sees every committed log for that client.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, List
+
+from sqlalchemy import Date, DateTime, and_, cast, delete, exists, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import ProgressLog, ProgressRollup
+
+PERIODS = {"day": 1, "week": 7}
+KEY_COLUMNS = ("client_id", "period", "period_start")
+VALUE_COLUMNS = (
+    "log_count", "weight_count", "weight_sum", "calorie_sum",
+    "latest_weight_date", "latest_weight"
+)
+
+# First key of the two-key advisory lock, so it can't collide with other users
+LOCK_NAMESPACE = 12012
+
+def period_start(period: str, day: date) -> date:
+    """Same boundaries as Postgres date_trunc: weeks start on Monday"""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+def rollup_query(period: str):
+    """Recompute rollup rows for a period from progress_logs"""
+    field = literal(period, literal_execute=True)
+    start = cast(func.date_trunc(field, cast(ProgressLog.date, DateTime)), Date)
+    weighed = ProgressLog.weight.is_not(None)
+    return select(
+        ProgressLog.client_id,
+        field.label("period"),
+        start.label("period_start"),
+        func.count().label("log_count"),
+        func.count(ProgressLog.weight).label("weight_count"),
+        func.coalesce(func.sum(ProgressLog.weight), 0.0).label("weight_sum"),
+        func.coalesce(func.sum(ProgressLog.calories), 0).label("calorie_sum"),
+        func.max(ProgressLog.date).filter(weighed).label("latest_weight_date"),
+        func.array_agg(
+            aggregate_order_by(ProgressLog.weight, ProgressLog.date.desc(), ProgressLog.id.desc())
+        ).filter(weighed)[1].label("latest_weight")
+    ).group_by(ProgressLog.client_id, start)
+
+def _refresh_statements(period: str, ranges: Dict[int, tuple]) -> list:
+    """Upsert the recomputed buckets in each client's range and drop emptied ones"""
+    days = PERIODS[period]
+    recomputed = rollup_query(period).where(or_(*(
+        and_(ProgressLog.client_id == client_id, ProgressLog.date >= start, ProgressLog.date < end)
+        for client_id, (start, end) in ranges.items()
+    )))
+    upsert = insert(ProgressRollup).from_select(KEY_COLUMNS + VALUE_COLUMNS, recomputed)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={column: upsert.excluded[column] for column in VALUE_COLUMNS}
+    )
+
+    has_logs = exists().where(
+        ProgressLog.client_id == ProgressRollup.client_id,
+        ProgressLog.date >= ProgressRollup.period_start,
+        ProgressLog.date < ProgressRollup.period_start + days
+    )
+    prune = delete(ProgressRollup).where(
+        ProgressRollup.period == period,
+        or_(*(
+            and_(ProgressRollup.client_id == client_id,
+                 ProgressRollup.period_start >= start, ProgressRollup.period_start < end)
+            for client_id, (start, end) in ranges.items()
+        )),
+        ~has_logs
+    )
+    return [upsert, prune]
+
+async def refresh_rollups(db: AsyncSession, days_by_client: Dict[int, Iterable[date]]):
+    """Bring the buckets containing the given days up to date.
+
+    Call after the log changes have been flushed and before commit.
+    """
+    days_by_client = {client_id: list(days) for client_id, days in days_by_client.items()}
+    days_by_client = {client_id: days for client_id, days in days_by_client.items() if days}
+    if not days_by_client:
+        return
+
+    # Sorted so concurrent multi-client writers always lock in the same order
+    for client_id in sorted(days_by_client):
+        await db.execute(select(func.pg_advisory_xact_lock(LOCK_NAMESPACE, client_id)))
+
+    for period, length in PERIODS.items():
+        ranges = {
+            client_id: (period_start(period, min(days)),
+                        period_start(period, max(days)) + timedelta(days=length))
+            for client_id, days in days_by_client.items()
+        }
+        for statement in _refresh_statements(period, ranges):
+            await db.execute(statement)
+
+def rebuild_rollups(connection) -> int:
+    """Replace the whole table with a full recompute; returns the row count"""
+    connection.execute(delete(ProgressRollup))
+    total = 0
+    for period in PERIODS:
+        result = connection.execute(
+            insert(ProgressRollup).from_select(KEY_COLUMNS + VALUE_COLUMNS, rollup_query(period))
+        )
+        total += result.rowcount
+    return total
+
+def find_rollup_mismatches(connection, tolerance: float = 1e-6) -> List[dict]:
+    """Compare the stored rollups with a full recompute, row by row"""
+    mismatches = []
+    for period in PERIODS:
+        expected = rollup_query(period).subquery()
+        stored = select(ProgressRollup).where(ProgressRollup.period == period).subquery()
+        joined = expected.join(
+            stored,
+            and_(*(expected.c[column] == stored.c[column] for column in KEY_COLUMNS)),
+            full=True
+        )
+        differs = [
+            expected.c[column].is_distinct_from(stored.c[column])
+            for column in VALUE_COLUMNS if column != "weight_sum"
+        ]
+        differs.append(func.abs(expected.c.weight_sum - stored.c.weight_sum) > tolerance)
+        differs.append(expected.c.client_id.is_(None))
+        differs.append(stored.c.client_id.is_(None))
+
+        query = select(
+            func.coalesce(expected.c.client_id, stored.c.client_id).label("client_id"),
+            func.coalesce(expected.c.period_start, stored.c.period_start).label("period_start"),
+            *(expected.c[column].label(f"expected_{column}") for column in VALUE_COLUMNS),
+            *(stored.c[column].label(f"stored_{column}") for column in VALUE_COLUMNS)
+        ).select_from(joined).where(or_(*differs)).order_by("client_id", "period_start")
+
+        for row in connection.execute(query):
+            mismatches.append({"period": period, **row._asdict()})
+    return mismatches
@@ -0,0 +1,381 @@
+"""
+Database seeding - the demo accounts plus a synthetic population of any size.
+
+Synthetic rows are generated per chunk in worker processes and loaded with COPY,
+so millions of progress logs take minutes. Every generated user of a role shares
+one precomputed bcrypt hash, and the same seed always produces the same rows.
+"""
+import io
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Sequence
+from sqlalchemy import insert, select, text
+from app.core.hashing import hash_password_blocking
+from app.db.database import engine
+from app.db.rollups import KEY_COLUMNS, PERIODS, VALUE_COLUMNS, rollup_query
+from app.models.models import Assignment, HealthTip, ProgressLog, ProgressRollup, User, Workout
+
+PASSWORDS = {"admin": "admin123", "trainer": "trainer123", "client": "client123"}
+SEED_EMAIL_DOMAIN = "seed.fitsphere.com"
+
+# Rows per COPY for users and workouts, and clients per assignments/logs chunk
+ROW_CHUNK = 50000
+CLIENT_CHUNK = 1000
+
+TABLES = "users, workouts, assignments, progress_logs, progress_rollups, health_tips, sync_tombstones"
+
+# Non-unique indexes are dropped during the bulk load and built once at the end,
+# several times faster than maintaining them row by row through COPY
+BULK_MODELS = (User, Workout, Assignment, ProgressLog)
+
+@dataclass
+class Profile:
+    """Size of the synthetic population; see Profile.scaled"""
+    users: int = 0
+    trainer_ratio: float = 0.05
+    workouts: int = 0
+    assignments_per_client: int = 5
+    logs_per_client: int = 500
+    health_tips: int = 0
+    seed: int = 1
+
+    @property
+    def trainers(self) -> int:
+        return max(1, int(self.users * self.trainer_ratio)) if self.users else 0
+
+    @property
+    def clients(self) -> int:
+        return self.users - self.trainers
+
+    @classmethod
+    def scaled(cls, scale: float, **overrides) -> "Profile":
+        """Scale 1 is 1k users, 10k workouts and ~475k progress logs; scale 20 is ~10M logs"""
+        profile = cls(users=int(1000 * scale), workouts=int(10000 * scale), health_tips=int(40 * scale))
+        for name, value in overrides.items():
+            if value is not None:
+                setattr(profile, name, value)
+        return profile
+
+# Demo data - the accounts and content the app has always shipped with
+
+DEMO_USERS = [
+    ("John Trainer", "trainer@fitsphere.com", "trainer"),
+    ("Sarah Fitness", "sarah@fitsphere.com", "trainer"),
+    ("Mike Client", "client@fitsphere.com", "client"),
+    ("Emma Wilson", "emma@fitsphere.com", "client"),
+    ("David Brown", "david@fitsphere.com", "client"),
+    ("Admin User", "admin@fitsphere.com", "admin"),
+]
+
+DEMO_WORKOUTS = [
+    ("trainer@fitsphere.com", "Full Body Strength Training", "A comprehensive full-body workout focusing on compound movements. Includes squats, deadlifts, bench press, and overhead press. Perfect for building overall strength and muscle mass."),
+    ("trainer@fitsphere.com", "Cardio Blast", "High-intensity cardio session designed to burn calories and improve cardiovascular health. Includes running, cycling, and HIIT exercises."),
+    ("trainer@fitsphere.com", "Core Strength & Stability", "Targeted core workout to improve stability and strength. Includes planks, crunches, Russian twists, and leg raises."),
+    ("sarah@fitsphere.com", "Yoga & Flexibility", "Gentle yoga flow focusing on flexibility, balance, and relaxation. Suitable for all fitness levels. Helps reduce stress and improve mobility."),
+    ("sarah@fitsphere.com", "Upper Body Power", "Intense upper body workout targeting chest, back, shoulders, and arms. Includes pull-ups, push-ups, and weight training exercises."),
+    ("sarah@fitsphere.com", "Leg Day Intensive", "Comprehensive lower body workout focusing on quads, hamstrings, glutes, and calves. Includes squats, lunges, leg presses, and calf raises."),
+]
+
+DEMO_ASSIGNMENTS = [
+    ("client@fitsphere.com", "Full Body Strength Training"),
+    ("client@fitsphere.com", "Cardio Blast"),
+    ("emma@fitsphere.com", "Yoga & Flexibility"),
+    ("emma@fitsphere.com", "Upper Body Power"),
+    ("david@fitsphere.com", "Core Strength & Stability"),
+    ("david@fitsphere.com", "Leg Day Intensive"),
+]
+
+# (client email, days ago, weight, calories, notes)
+DEMO_LOGS = [
+    ("client@fitsphere.com", 7, 75.5, 2500, "Feeling strong after full body workout. Increased weights this week."),
+    ("client@fitsphere.com", 3, 75.2, 2300, "Good cardio session. Maintained weight, feeling more energetic."),
+    ("client@fitsphere.com", 0, 74.8, 2400, "Great progress! Lost some weight while maintaining strength."),
+    ("emma@fitsphere.com", 5, 65.0, 2000, "Yoga session was very relaxing. Improved flexibility noticed."),
+    ("emma@fitsphere.com", 2, 64.8, 2100, "Upper body workout was challenging but rewarding."),
+    ("david@fitsphere.com", 4, 82.0, 2800, "Core workout was intense. Feeling stronger in the midsection."),
+    ("david@fitsphere.com", 1, 81.5, 2700, "Leg day was tough but completed all sets. Good form maintained."),
+]
+
+DEMO_HEALTH_TIPS = [
+    ("Stay Hydrated", "Drink at least 8 glasses of water daily. Proper hydration is essential for optimal performance, recovery, and overall health. Water helps transport nutrients, regulate body temperature, and flush out toxins."),
+    ("Get Enough Sleep", "Aim for 7-9 hours of quality sleep each night. Sleep is crucial for muscle recovery, hormone regulation, and mental clarity. Poor sleep can negatively impact your fitness progress and overall well-being."),
+    ("Warm Up Before Exercise", "Always start your workout with a 5-10 minute warm-up. This prepares your muscles, increases blood flow, and reduces the risk of injury. Include light cardio and dynamic stretching."),
+    ("Eat Balanced Meals", "Include a mix of protein, carbohydrates, and healthy fats in every meal. Protein supports muscle repair, carbs provide energy, and fats are essential for hormone production and nutrient absorption."),
+    ("Listen to Your Body", "Pay attention to your body's signals. Rest when you're tired, and don't push through pain. Overtraining can lead to injuries and burnout. Recovery is just as important as training."),
+    ("Set Realistic Goals", "Set achievable, measurable goals with specific timelines. Break large goals into smaller milestones. Celebrate your progress along the way to stay motivated and maintain consistency."),
+    ("Include Strength Training", "Don't skip strength training! Building muscle helps boost metabolism, improve bone density, and enhance daily functional movements. Aim for 2-3 strength sessions per week."),
+    ("Track Your Progress", "Keep a record of your workouts, measurements, and how you feel. Tracking progress helps identify what's working, keeps you accountable, and provides motivation when you see improvements."),
+    ("Stretch Regularly", "Incorporate stretching into your routine, especially after workouts. Stretching improves flexibility, reduces muscle tension, and can help prevent injuries. Hold stretches for 20-30 seconds."),
+    ("Stay Consistent", "Consistency is key to achieving fitness goals. It's better to do moderate exercise regularly than intense workouts sporadically. Find a routine that fits your lifestyle and stick to it."),
+]
+
+# Vocabulary for synthetic rows
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn",
+               "Maria", "Liam", "Noah", "Olivia", "Emma", "Ava", "Lucas", "Mia", "Ethan", "Zoe",
+               "Aisha", "Kenji", "Priya", "Mateo"]
+LAST_NAMES = ["Smith", "Johnson", "Garcia", "Brown", "Lee", "Martin", "Clark", "Lopez", "Walker", "Young",
+              "Hall", "Allen", "King", "Wright", "Scott", "Green", "Baker", "Adams", "Nelson", "Hill",
+              "Patel", "Kim", "Nguyen", "Silva"]
+MOVES = ["squat", "deadlift", "bench press", "row", "lunge", "push-up", "pull-up", "plank",
+         "burpee", "kettlebell swing", "clean", "snatch", "thruster", "box jump", "sprint", "swim"]
+STYLES = ["Strength", "HIIT", "Endurance", "Mobility", "Power", "Core", "Conditioning", "Recovery"]
+LOG_NOTES = ["Felt strong today", "Short on sleep, kept it light", "New personal best",
+             "Sore from yesterday", "Great energy", "Skipped cardio", "Added extra mobility work"]
+TIP_TOPICS = ["hydration", "sleep", "protein", "warm-ups", "recovery", "consistency", "posture", "stretching"]
+
+def _rng(profile: Profile, kind: str, first: int) -> random.Random:
+    # String seeds hash deterministically, so each chunk is reproducible on its own
+    return random.Random(f"{profile.seed}:{kind}:{first}")
+
+def _copy(cursor, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """COPY rows in text format; None becomes NULL"""
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write("\t".join(
+            "\\N" if value is None else str(value).replace("\\", "\\\\").replace("\t", " ").replace("\n", " ")
+            for value in row
+        ))
+        buffer.write("\n")
+        count += 1
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    return count
+
+@dataclass
+class Layout:
+    """Where the synthetic ids start; trainers come first, then clients"""
+    first_user_id: int
+    first_workout_id: int
+
+    def trainer_id(self, index: int) -> int:
+        return self.first_user_id + index
+
+    def client_id(self, profile: Profile, index: int) -> int:
+        return self.first_user_id + profile.trainers + index
+
+def _user_rows(profile: Profile, layout: Layout, hashes: Dict[str, str], first: int, last: int):
+    rng = _rng(profile, "users", first)
+    for index in range(first, last):
+        role = "trainer" if index < profile.trainers else "client"
+        user_id = layout.first_user_id + index
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        yield user_id, name, f"{role}{user_id}@{SEED_EMAIL_DOMAIN}", hashes[role], role
+
+def _workout_rows(profile: Profile, layout: Layout, first: int, last: int):
+    rng = _rng(profile, "workouts", first)
+    for index in range(first, last):
+        style, moves = rng.choice(STYLES), rng.sample(MOVES, 3)
+        description = (
+            f"{rng.randint(3, 6)} rounds: {rng.randint(6, 15)} {moves[0]}, "
+            f"{rng.randint(8, 20)} {moves[1]}, then {rng.choice((200, 400, 800))}m {moves[2]}"
+        )
+        yield (layout.first_workout_id + index, layout.trainer_id(index % profile.trainers),
+               f"{style} {moves[0]} #{index + 1}", description)
+
+def _assignment_rows(profile: Profile, layout: Layout, rng: random.Random, client_index: int):
+    # Each client trains with one trainer and gets a few of that trainer's workouts
+    trainer_index = client_index % profile.trainers
+    owned = range(trainer_index, profile.workouts, profile.trainers)
+    client_id = layout.client_id(profile, client_index)
+    for workout_index in rng.sample(owned, min(profile.assignments_per_client, len(owned))):
+        yield client_id, layout.first_workout_id + workout_index
+
+def _log_rows(profile: Profile, layout: Layout, rng: random.Random, client_index: int, today: date):
+    # Logs on most days of a recent window ending today, with a drifting weight
+    count = profile.logs_per_client
+    span = count + count // 5
+    start = today - timedelta(days=span - 1)
+    weight = rng.uniform(50, 110)
+    trend = rng.uniform(-0.03, 0.01)
+    client_id = layout.client_id(profile, client_index)
+    for day in sorted(rng.sample(range(span), count)):
+        weight = max(35.0, weight + trend + rng.gauss(0, 0.3))
+        yield (
+            client_id,
+            start + timedelta(days=day),
+            round(weight, 1) if rng.random() < 0.9 else None,
+            rng.randint(1400, 3200) if rng.random() < 0.95 else None,
+            rng.choice(LOG_NOTES) if rng.random() < 0.15 else None,
+        )
+
+def _load_rows(kind: str, profile: Profile, layout: Layout, hashes: Dict[str, str], first: int, last: int) -> int:
+    """Worker: COPY one chunk of users or workouts"""
+    with engine.begin() as connection:
+        cursor = connection.connection.cursor()
+        if kind == "users":
+            return _copy(cursor, "users", ("id", "name", "email", "password_hash", "role"),
+                         _user_rows(profile, layout, hashes, first, last))
+        return _copy(cursor, "workouts", ("id", "trainer_id", "title", "description"),
+                     _workout_rows(profile, layout, first, last))
+
+def _load_clients(profile: Profile, layout: Layout, first: int, last: int, today: date) -> Dict[str, int]:
+    """Worker: COPY assignments and progress logs for a range of clients, then their rollups"""
+    rng = _rng(profile, "clients", first)
+    counts = {}
+    with engine.begin() as connection:
+        cursor = connection.connection.cursor()
+        counts["assignments"] = _copy(cursor, "assignments", ("client_id", "workout_id"), (
+            row for index in range(first, last) for row in _assignment_rows(profile, layout, rng, index)
+        ))
+        counts["progress_logs"] = _copy(cursor, "progress_logs", ("client_id", "date", "weight", "calories", "notes"), (
+            row for index in range(first, last) for row in _log_rows(profile, layout, rng, index, today)
+        ))
+        counts["progress_rollups"] = insert_rollups(
+            connection, layout.client_id(profile, first), layout.client_id(profile, last - 1)
+        )
+    return counts
+
+def insert_rollups(connection, first_client_id: int, last_client_id: int) -> int:
+    """Compute rollups for clients that have none yet, e.g. right after loading their logs"""
+    total = 0
+    for period in PERIODS:
+        recomputed = rollup_query(period).where(ProgressLog.client_id.between(first_client_id, last_client_id))
+        result = connection.execute(insert(ProgressRollup).from_select(KEY_COLUMNS + VALUE_COLUMNS, recomputed))
+        total += result.rowcount
+    return total
+
+
+def _chunks(total: int, size: int):
+    for first in range(0, total, size):
+        yield first, min(first + size, total)
+
+def _seed_demo(connection, hashes: Dict[str, str], today: date) -> Dict[str, int]:
+    user_ids = dict(connection.execute(
+        insert(User).returning(User.email, User.id),
+        [{"name": name, "email": email, "password_hash": hashes[role], "role": role}
+         for name, email, role in DEMO_USERS]
+    ).all())
+    workout_ids = dict(connection.execute(
+        insert(Workout).returning(Workout.title, Workout.id),
+        [{"trainer_id": user_ids[email], "title": title, "description": description}
+         for email, title, description in DEMO_WORKOUTS]
+    ).all())
+    connection.execute(insert(Assignment), [
+        {"client_id": user_ids[email], "workout_id": workout_ids[title]} for email, title in DEMO_ASSIGNMENTS
+    ])
+    connection.execute(insert(ProgressLog), [
+        {"client_id": user_ids[email], "date": today - timedelta(days=days_ago),
+         "weight": weight, "calories": calories, "notes": notes}
+        for email, days_ago, weight, calories, notes in DEMO_LOGS
+    ])
+    connection.execute(insert(HealthTip), [{"title": title, "content": content} for title, content in DEMO_HEALTH_TIPS])
+    client_ids = [user_ids[email] for _, email, role in DEMO_USERS if role == "client"]
+    rollups = insert_rollups(connection, min(client_ids), max(client_ids))
+    return {"users": len(user_ids), "workouts": len(workout_ids), "assignments": len(DEMO_ASSIGNMENTS),
+            "progress_logs": len(DEMO_LOGS), "health_tips": len(DEMO_HEALTH_TIPS), "progress_rollups": rollups}
+
+def _health_tip_rows(profile: Profile):
+    rng = _rng(profile, "health_tips", 0)
+    for number in range(1, profile.health_tips + 1):
+        topic = rng.choice(TIP_TOPICS)
+        yield (f"{topic.capitalize()} tip #{number}",
+               f"Small habits around {topic} add up. Pick one change this week and track how it feels.")
+
+def _secondary_indexes() -> list:
+    return [index for model in BULK_MODELS for index in model.__table__.indexes if not index.unique]
+
+def is_seeded() -> bool:
+    with engine.connect() as connection:
+        return connection.scalar(select(User.id).limit(1)) is not None
+
+def clear_database():
+    """Delete every row, keeping the schema"""
+    with engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {TABLES} RESTART IDENTITY CASCADE"))
+
+def drop_schema():
+    """Drop every table, function and the migration history; run upgrade_database afterwards"""
+    with engine.begin() as connection:
+        connection.execute(text("DROP SCHEMA public CASCADE"))
+        connection.execute(text("CREATE SCHEMA public"))
+
+def _load_population(profile: Profile, layout: Layout, hashes: Dict[str, str], today: date,
+                     counts: Dict[str, int], jobs: int, log):
+    # spawn, like the bcrypt pool: workers open their own connections
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for kind, total in (("users", profile.users), ("workouts", profile.workouts)):
+            step = time.perf_counter()
+            futures = [pool.submit(_load_rows, kind, profile, layout, hashes, first, last)
+                       for first, last in _chunks(total, ROW_CHUNK)]
+            counts[kind] += sum(future.result() for future in futures)
+            log(f"  {kind:<27} {time.perf_counter() - step:7.1f}s  {total:>12,} rows")
+
+        step = time.perf_counter()
+        futures = [pool.submit(_load_clients, profile, layout, first, last, today)
+                   for first, last in _chunks(profile.clients, CLIENT_CHUNK)]
+        done = 0
+        for future in as_completed(futures):
+            for table, count in future.result().items():
+                counts[table] += count
+            done += 1
+            if done % max(1, len(futures) // 10) == 0 or done == len(futures):
+                elapsed = time.perf_counter() - step
+                log(f"  {f'client chunks {done}/{len(futures)}':<27} {elapsed:7.1f}s  "
+                    f"{counts['progress_logs']:>12,} logs  {counts['progress_logs'] / elapsed:,.0f}/s")
+
+    # Explicit ids were copied in, so move the sequences past them
+    with engine.begin() as connection:
+        for table in ("users", "workouts"):
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+            ))
+
+def seed(profile: Profile, jobs: Optional[int] = None, log=print) -> Dict[str, int]:
+    """Insert the demo data and the profile's synthetic population into an empty database"""
+    started = time.perf_counter()
+    today = date.today()
+    hashes = {role: hash_password_blocking(password) for role, password in PASSWORDS.items()}
+
+    with engine.begin() as connection:
+        counts = _seed_demo(connection, hashes, today)
+        layout = Layout(
+            first_user_id=connection.scalar(text("SELECT max(id) + 1 FROM users")),
+            first_workout_id=connection.scalar(text("SELECT max(id) + 1 FROM workouts"))
+        )
+        if profile.health_tips:
+            counts["health_tips"] += _copy(connection.connection.cursor(), "health_tips", ("title", "content"),
+                                           _health_tip_rows(profile))
+    log(f"  demo data and health tips   {time.perf_counter() - started:7.1f}s")
+
+    if profile.users:
+        if profile.workouts < profile.trainers:
+            raise ValueError("Need at least one workout per trainer")
+        with engine.begin() as connection:
+            for index in _secondary_indexes():
+                index.drop(connection)
+        try:
+            _load_population(profile, layout, hashes, today, counts, jobs or os.cpu_count() or 1, log)
+        finally:
+            step = time.perf_counter()
+            with engine.begin() as connection:
+                connection.execute(text("SET LOCAL maintenance_work_mem = '512MB'"))
+                for index in _secondary_indexes():
+                    index.create(connection)
+            log(f"  indexes                     {time.perf_counter() - step:7.1f}s")
+
+    step = time.perf_counter()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("VACUUM ANALYZE"))
+    log(f"  vacuum analyze              {time.perf_counter() - step:7.1f}s")
+    return counts
+
+def summary(connection) -> dict:
+    """Id ranges of the synthetic users and approximate table sizes"""
+    rows = connection.execute(text("""
+        SELECT role, min(id) AS first_id, max(id) AS last_id, count(*) AS count
+        FROM users WHERE email LIKE :pattern GROUP BY role
+    """), {"pattern": "%@" + SEED_EMAIL_DOMAIN}).all()
+    roles = {row.role: {"first_id": row.first_id, "last_id": row.last_id, "count": row.count} for row in rows}
+    # Planner estimates: exact after the VACUUM ANALYZE in seed, and instant on 50M rows
+    tables = dict(connection.execute(text("""
+        SELECT relname, reltuples::bigint FROM pg_class
+        WHERE relname IN ('users', 'workouts', 'assignments', 'progress_logs')
+    """)).all())
+    return {"roles": roles, "rows": tables}
@@ -1,26 +1,39 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import auth, users, workouts, assignments, progress, health_tips
-from app.db.database import engine, Base
+from app.routes import auth, users, workouts, assignments, progress, health_tips, dashboard, sync, events, internal, metrics
+from app.core import hashing, prometheus
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.timing import RequestTimingMiddleware
+from app.db.database import read_replicas
+from app.db.replicas import ReadYourWritesMiddleware
 
+# The schema is managed by Alembic - run `alembic upgrade head` before starting the API
 
-try:
-    Base.metadata.create_all(bind=engine)
-except Exception as e:
-    print(f"Warning: Could not create tables. Make sure database is running and connection is correct.")
-    print(f"Error: {e}")
-
-app = FastAPI(title="FitSphere API", version="1.0.0")
+app = FastAPI(title="FitSphere API", version="1.0.0", default_response_class=ORJSONResponse)
 
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+if settings.READ_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware, seconds=settings.READ_YOUR_WRITES_SECONDS)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    thread_size=settings.COMPRESSION_THREAD_SIZE,
+)
+
+# Outermost, so app time covers the other middleware too
+app.add_middleware(RequestTimingMiddleware, header=settings.SERVER_TIMING_HEADER)
+
 
 app.include_router(auth.router)
 app.include_router(users.router)
@@ -28,6 +41,31 @@ app.include_router(workouts.router)
 app.include_router(assignments.router)
 app.include_router(progress.router)
 app.include_router(health_tips.router)
+app.include_router(dashboard.router)
+app.include_router(sync.router)
+app.include_router(events.router)
+app.include_router(internal.router)
+app.include_router(metrics.router)
+
+@app.on_event("startup")
+async def start_replica_checks():
+    await read_replicas.start(settings.REPLICA_CHECK_INTERVAL)
+
+@app.on_event("shutdown")
+async def stop_replica_checks():
+    await read_replicas.stop()
+
+@app.on_event("startup")
+async def start_metrics_flush():
+    prometheus.start()
+
+@app.on_event("shutdown")
+async def stop_metrics_flush():
+    prometheus.stop()
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    hashing.shutdown()
 
 @app.get("/")
 def root():
@@ -44,7 +82,10 @@ def api_info():
             "workouts": "/api/workouts",
             "assignments": "/api/assignments",
             "progress": "/api/progress",
-            "health-tips": "/api/health-tips"
+            "health-tips": "/api/health-tips",
+            "dashboard": "/api/dashboard",
+            "sync": "/api/sync",
+            "events": "/api/events"
         }
     }
 
@@ -1,7 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, Float, Date, ForeignKey, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Computed, DateTime, Integer, String, Text, Float, Date, ForeignKey, Index, UniqueConstraint, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from app.db.database import Base
 
+# Change version for delta sync: the id of the writing transaction. It is set on
+# insert by this default and on update by the bump_revision trigger (migration 0006).
+CHANGE_REVISION = text("(pg_current_xact_id()::text::bigint)")
+
 class User(Base):
     __tablename__ = "users"
     
@@ -11,6 +16,8 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     role = Column(String(20), nullable=False)  # admin, trainer, client
     
+    __table_args__ = (Index('ix_users_role_id', role, id),)
+    
     # Relationships
     workouts = relationship("Workout", back_populates="trainer", cascade="all, delete-orphan")
     assignments_as_client = relationship("Assignment", foreign_keys="Assignment.client_id", back_populates="client", cascade="all, delete-orphan")
@@ -23,6 +30,18 @@ class Workout(Base):
     trainer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
+    revision = Column(BigInteger, nullable=False, server_default=CHANGE_REVISION, index=True)
+    # Maintained by Postgres on every write; deferred so ORM loads skip it
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+        persisted=True
+    )))
+    
+    __table_args__ = (
+        Index('ix_workouts_trainer_id_id', trainer_id, id),
+        Index('ix_workouts_search_vector', 'search_vector', postgresql_using='gin'),
+    )
     
     # Relationships
     trainer = relationship("User", back_populates="workouts")
@@ -34,8 +53,12 @@ class Assignment(Base):
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     workout_id = Column(Integer, ForeignKey("workouts.id"), nullable=False)
+    revision = Column(BigInteger, nullable=False, server_default=CHANGE_REVISION, index=True)
     
-    __table_args__ = (UniqueConstraint('client_id', 'workout_id', name='unique_client_workout'),)
+    __table_args__ = (
+        UniqueConstraint('client_id', 'workout_id', name='unique_client_workout'),
+        Index('ix_assignments_workout_id', workout_id),
+    )
     
     # Relationships
     client = relationship("User", foreign_keys=[client_id], back_populates="assignments_as_client")
@@ -50,10 +73,46 @@ class ProgressLog(Base):
     weight = Column(Float, nullable=True)
     calories = Column(Integer, nullable=True)
     notes = Column(Text, nullable=True)
+    revision = Column(BigInteger, nullable=False, server_default=CHANGE_REVISION, index=True)
+    
+    # Match the (date, id) DESC keyset order used by the progress listings
+    __table_args__ = (
+        UniqueConstraint('client_id', 'date', name='unique_client_date'),
+        Index('ix_progress_logs_client_id_date_id', client_id, date.desc(), id.desc()),
+        Index('ix_progress_logs_date_id', date.desc(), id.desc()),
+    )
     
     # Relationships
     client = relationship("User", back_populates="progress_logs")
 
+class ProgressRollup(Base):
+    """Per-client daily and weekly progress totals, maintained by app.db.rollups"""
+    __tablename__ = "progress_rollups"
+    
+    client_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    period = Column(String(10), primary_key=True)  # day, week
+    period_start = Column(Date, primary_key=True)
+    log_count = Column(Integer, nullable=False)
+    weight_count = Column(Integer, nullable=False)
+    weight_sum = Column(Float, nullable=False)
+    calorie_sum = Column(BigInteger, nullable=False)
+    latest_weight_date = Column(Date, nullable=True)
+    latest_weight = Column(Float, nullable=True)
+
+class SyncTombstone(Base):
+    """One row per deleted workout, assignment or progress log, written by a delete trigger"""
+    __tablename__ = "sync_tombstones"
+    
+    id = Column(BigInteger, primary_key=True)
+    table_name = Column(String(50), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    # Who should hear about the delete; no foreign keys so tombstones outlive the users
+    client_id = Column(Integer, nullable=True)
+    trainer_id = Column(Integer, nullable=True)
+    workout_id = Column(Integer, nullable=True)
+    revision = Column(BigInteger, nullable=False, server_default=CHANGE_REVISION, index=True)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
 class HealthTip(Base):
     __tablename__ = "health_tips"
     
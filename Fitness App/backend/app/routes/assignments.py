@@ -1,50 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.config import settings
+from app.core.events import notify
+from app.core.responses import trusted_json
+from app.db.database import get_db, get_read_db
 from app.models.models import Assignment, User, Workout
-from app.schemas.schemas import AssignmentCreate, AssignmentResponse
+from app.schemas.schemas import (
+    AssignmentBatchCreate, AssignmentBatchResponse, AssignmentCreate, AssignmentResponse, Page
+)
 from app.core.simple_auth import get_user_by_id
+from app.core.pagination import build_page, decode_cursor, page_limit, row_id
 
 router = APIRouter(prefix="/api/assignments", tags=["assignments"])
 
-@router.get("", response_model=List[AssignmentResponse])
-def get_assignments(
+def assignment_listing_query():
+    """Assignment columns plus client name and workout title in one statement"""
+    return select(
+        Assignment.id,
+        Assignment.client_id,
+        Assignment.workout_id,
+        User.name.label("client_name"),
+        Workout.title.label("workout_title")
+    ).join(User, User.id == Assignment.client_id).join(Workout, Workout.id == Assignment.workout_id)
+
+@router.get("", response_model=Page[AssignmentResponse])
+async def get_assignments(
     user_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_read_db)
 ):
+    query = assignment_listing_query()
+    
     # If user_id provided, filter by user role
     if user_id:
-        user = get_user_by_id(user_id, db)
-        if user.role == "trainer" or user.role == "admin":
-            assignments = db.query(Assignment).all()
-        else:
-            assignments = db.query(Assignment).filter(Assignment.client_id == user_id).all()
-    else:
-        # No user_id - return all assignments
-        assignments = db.query(Assignment).all()
-    
-    result = []
-    for assignment in assignments:
-        client = db.query(User).filter(User.id == assignment.client_id).first()
-        workout = db.query(Workout).filter(Workout.id == assignment.workout_id).first()
-        result.append({
-            "id": assignment.id,
-            "client_id": assignment.client_id,
-            "workout_id": assignment.workout_id,
-            "client_name": client.name if client else None,
-            "workout_title": workout.title if workout else None
-        })
-    
-    return result
+        user = await get_user_by_id(user_id, db)
+        if user.role == "trainer":
+            # Trainers only see assignments of their own workouts
+            query = query.where(Workout.trainer_id == user.id)
+        elif user.role != "admin":
+            query = query.where(Assignment.client_id == user.id)
+    
+    if cursor:
+        (after_id,) = decode_cursor(cursor, row_id)
+        query = query.where(Assignment.id > after_id)
+    
+    result = await db.execute(query.order_by(Assignment.id).limit(limit + 1))
+    rows = [row._asdict() for row in result]
+    return trusted_json(build_page(rows, limit, lambda row: [row["id"]]))
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=AssignmentResponse)
-def create_assignment(
+async def create_assignment(
     assignment_data: AssignmentCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if client exists
-    client = get_user_by_id(assignment_data.client_id, db)
+    client = await get_user_by_id(assignment_data.client_id, db)
     if client.role != "client":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -52,7 +66,7 @@ def create_assignment(
         )
     
     # Check if workout exists
-    workout = db.query(Workout).filter(Workout.id == assignment_data.workout_id).first()
+    workout = await db.get(Workout, assignment_data.workout_id)
     if not workout:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,10 +74,10 @@ def create_assignment(
         )
     
     # Check if assignment already exists
-    existing = db.query(Assignment).filter(
+    existing = await db.scalar(select(Assignment).where(
         Assignment.client_id == assignment_data.client_id,
         Assignment.workout_id == assignment_data.workout_id
-    ).first()
+    ))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -75,9 +89,15 @@ def create_assignment(
         workout_id=assignment_data.workout_id
     )
     db.add(new_assignment)
-    db.commit()
-    db.refresh(new_assignment)
+    await db.commit()
+    await db.refresh(new_assignment)
     
+    await notify(
+        "assignment.created",
+        {"id": new_assignment.id, "client_id": client.id, "workout_id": workout.id},
+        trainer_ids=[workout.trainer_id],
+        client_ids=[client.id]
+    )
     return {
         "id": new_assignment.id,
         "client_id": new_assignment.client_id,
@@ -86,20 +106,112 @@ def create_assignment(
         "workout_title": workout.title
     }
 
+@router.post("/batch", response_model=AssignmentBatchResponse)
+async def create_assignments_batch(
+    batch: AssignmentBatchCreate,
+    trainer_id: int = Query(..., description="Trainer ID"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Assign every workout to every client; pairs that already exist are skipped.
+    
+    Trainers can only assign their own workouts; admins can assign any.
+    """
+    client_ids = list(dict.fromkeys(batch.client_ids))
+    workout_ids = list(dict.fromkeys(batch.workout_ids))
+    if len(client_ids) * len(workout_ids) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_ITEMS} assignments per request"
+        )
+    
+    # One query per side instead of a lookup per pair
+    clients = dict((await db.execute(
+        select(User.id, User.name).where(User.id.in_(client_ids), User.role == "client")
+    )).all())
+    workout_rows = (await db.execute(
+        select(Workout.id, Workout.title, Workout.trainer_id).where(Workout.id.in_(workout_ids))
+    )).all()
+    workouts = {row.id: row.title for row in workout_rows}
+    invalid_clients = [client_id for client_id in client_ids if client_id not in clients]
+    invalid_workouts = [workout_id for workout_id in workout_ids if workout_id not in workouts]
+    if invalid_clients or invalid_workouts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "Unknown clients or workouts",
+                "invalid_client_ids": invalid_clients,
+                "invalid_workout_ids": invalid_workouts
+            }
+        )
+    
+    trainer = await get_user_by_id(trainer_id, db)
+    if trainer.role != "admin":
+        foreign = [row.id for row in workout_rows if row.trainer_id != trainer_id]
+        if trainer.role != "trainer" or foreign:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail={
+                    "message": "Not authorized to assign these workouts",
+                    "workout_ids": foreign if trainer.role == "trainer" else workout_ids
+                }
+            )
+    
+    pairs = [
+        {"client_id": client_id, "workout_id": workout_id}
+        for client_id in client_ids for workout_id in workout_ids
+    ]
+    statement = insert(Assignment.__table__).on_conflict_do_nothing(
+        constraint="unique_client_workout"
+    ).returning(Assignment.id, Assignment.client_id, Assignment.workout_id)
+    result = await db.execute(statement, pairs)
+    created = {(row.client_id, row.workout_id): row.id for row in result}
+    await db.commit()
+    
+    if created:
+        await notify(
+            "assignment.batch",
+            {"ids": sorted(created.values())},
+            trainer_ids={row.trainer_id for row in workout_rows},
+            client_ids={client_id for client_id, _ in created}
+        )
+    
+    return {
+        "created": [
+            {
+                "id": assignment_id,
+                "client_id": client_id,
+                "workout_id": workout_id,
+                "client_name": clients[client_id],
+                "workout_title": workouts[workout_id]
+            }
+            for (client_id, workout_id), assignment_id in created.items()
+        ],
+        "skipped": [
+            pair for pair in pairs if (pair["client_id"], pair["workout_id"]) not in created
+        ]
+    }
+
 @router.delete("/{assignment_id}", status_code=status.HTTP_200_OK)
-def delete_assignment(
+async def delete_assignment(
     assignment_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    assignment = await db.get(Assignment, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Assignment not found"
         )
     
-    db.delete(assignment)
-    db.commit()
+    workout = await db.get(Workout, assignment.workout_id)
+    await db.delete(assignment)
+    await db.commit()
+    
+    await notify(
+        "assignment.deleted",
+        {"id": assignment_id, "client_id": assignment.client_id, "workout_id": assignment.workout_id},
+        trainer_ids=[workout.trainer_id],
+        client_ids=[assignment.client_id]
+    )
     
     return {"message": "Assignment removed successfully"}
-
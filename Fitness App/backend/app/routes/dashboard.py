@@ -0,0 +1,117 @@
+import asyncio
+from typing import Tuple
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.config import settings
+from app.core.responses import trusted_json
+from app.core.simple_auth import get_user_by_id
+from app.db.database import get_read_sessionmaker
+from app.models.models import Assignment, ProgressLog, User, Workout
+from app.routes.assignments import assignment_listing_query
+from app.routes.progress import LOG_COLUMNS
+from app.routes.sync import current_sync_token
+from app.routes.workouts import workout_listing_query
+from app.schemas.schemas import ClientDashboard, TrainerDashboard
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+USER_COLUMNS = (User.id, User.name, User.email, User.role)
+
+# Shared by every dashboard in this worker: sections overlap, but together they
+# never hold more than DASHBOARD_CONCURRENT_QUERIES pool connections
+_sections = asyncio.Semaphore(settings.DASHBOARD_CONCURRENT_QUERIES)
+
+async def _fetch(sessions: async_sessionmaker, query) -> list:
+    """Run one dashboard section on its own session so sections can overlap"""
+    async with _sections:
+        async with sessions() as db:
+            result = await db.execute(query)
+            return [row._asdict() for row in result]
+
+async def _fetch_newest(sessions: async_sessionmaker, query, *order_by) -> list:
+    """The newest DASHBOARD_ROW_LIMIT rows by the descending order_by, returned oldest first"""
+    newest = query.order_by(*(column.desc() for column in order_by)).limit(settings.DASHBOARD_ROW_LIMIT)
+    rows = await _fetch(sessions, newest)
+    rows.reverse()
+    return rows
+
+async def _load_user(sessions: async_sessionmaker, user_id: int) -> Tuple[User, str]:
+    """The user plus a sync token taken before any section is read.
+    
+    Sections must come from the same server as the token: a replica further
+    behind might not show rows the token counts as delivered.
+    """
+    # Own short session, so its connection is back in the pool before the fan-out
+    async with sessions() as db:
+        return await get_user_by_id(user_id, db), await current_sync_token(db)
+
+def _user_payload(user: User) -> dict:
+    return {"id": user.id, "name": user.name, "email": user.email, "role": user.role}
+
+@router.get("/trainer/{user_id}", response_model=TrainerDashboard)
+async def get_trainer_dashboard(user_id: int, sessions: async_sessionmaker = Depends(get_read_sessionmaker)):
+    """Everything TrainerDashboard shows, with the sections queried concurrently"""
+    user, sync_token = await _load_user(sessions, user_id)
+    if user.role != "trainer" and user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only trainers can view the trainer dashboard"
+        )
+    
+    assignments = assignment_listing_query()
+    if user.role == "trainer":
+        assignments = assignments.where(Workout.trainer_id == user.id)
+    
+    clients, workouts, assignments, progress_logs = await asyncio.gather(
+        _fetch_newest(sessions, select(*USER_COLUMNS).where(User.role == "client"), User.id),
+        _fetch_newest(sessions, workout_listing_query().where(Workout.trainer_id == user.id), Workout.id),
+        _fetch_newest(sessions, assignments, Assignment.id),
+        _fetch(
+            sessions,
+            select(*LOG_COLUMNS)
+            .order_by(ProgressLog.date.desc(), ProgressLog.id.desc())
+            .limit(settings.DASHBOARD_LOG_LIMIT)
+        )
+    )
+    return trusted_json({
+        "user": _user_payload(user),
+        "sync_token": sync_token,
+        "clients": clients,
+        "workouts": workouts,
+        "assignments": assignments,
+        "progress_logs": progress_logs
+    })
+
+@router.get("/client/{user_id}", response_model=ClientDashboard)
+async def get_client_dashboard(user_id: int, sessions: async_sessionmaker = Depends(get_read_sessionmaker)):
+    """Everything ClientDashboard shows, with the sections queried concurrently"""
+    user, sync_token = await _load_user(sessions, user_id)
+    if user.role != "client":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only clients can view the client dashboard"
+        )
+    
+    workouts, progress_logs = await asyncio.gather(
+        _fetch_newest(
+            sessions,
+            workout_listing_query()
+            .join(Assignment, Assignment.workout_id == Workout.id)
+            .where(Assignment.client_id == user.id),
+            Workout.id
+        ),
+        _fetch(
+            sessions,
+            select(*LOG_COLUMNS)
+            .where(ProgressLog.client_id == user.id)
+            .order_by(ProgressLog.date.desc(), ProgressLog.id.desc())
+            .limit(settings.DASHBOARD_LOG_LIMIT)
+        )
+    )
+    return trusted_json({
+        "user": _user_payload(user),
+        "sync_token": sync_token,
+        "workouts": workouts,
+        "progress_logs": progress_logs
+    })
@@ -0,0 +1,62 @@
+import json
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
+from app.core.config import settings
+from app.core.events import Event, SubscriberLimitReached, client_channel, get_bus, trainer_channel
+from app.core.security import cache_user, invalidation_count, user_cache
+from app.core.simple_auth import get_user_by_id
+from app.db.database import AsyncSessionLocal
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+def _format(event: Event) -> str:
+    # Unnamed SSE messages, so browsers get every type through EventSource.onmessage
+    return f"data: {json.dumps({'type': event.type, **event.data})}\n\n"
+
+async def _event_stream(bus, channel: str) -> AsyncIterator[str]:
+    # Subscribing here, not in the route, puts the subscription under the finally
+    # below: a client that leaves before the body starts never subscribes at all
+    try:
+        subscription = bus.subscribe(channel)
+    except SubscriberLimitReached:
+        # The last slots went to other streams since the route checked
+        yield "retry: 30000\n\n"
+        return
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            event = await subscription.get(timeout=settings.EVENTS_HEARTBEAT_SECONDS)
+            # Comment lines keep proxies from closing an idle stream
+            yield _format(event) if event else ": heartbeat\n\n"
+    finally:
+        subscription.close()
+
+@router.get("/{user_id}")
+async def stream_events(user_id: int):
+    """Server-sent change notifications for one trainer or client.
+    
+    Events only name what changed; dashboards fetch the rows through /api/sync.
+    A "resync" event means notifications were dropped and a full sync is due.
+    """
+    # Reconnect storms after a restart mostly hit the auth cache. On a miss, use a
+    # short session: a request-scoped one would pin a pool connection for the stream
+    user = user_cache.get(user_id)
+    if user is None:
+        loaded_after = invalidation_count()
+        async with AsyncSessionLocal() as db:
+            user = cache_user(await get_user_by_id(user_id, db), loaded_after)
+    channel = client_channel(user.id) if user.role == "client" else trainer_channel(user.id)
+    
+    bus = get_bus()
+    if not bus.has_capacity():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open event streams",
+            headers={"Retry-After": "30"}
+        )
+    return StreamingResponse(
+        _event_stream(bus, channel),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,40 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Awaitable, Callable, Hashable, Optional
 from app.db.database import get_db
 from app.models.models import HealthTip
-from app.schemas.schemas import HealthTipCreate, HealthTipResponse
+from app.schemas.schemas import HealthTipCreate, HealthTipResponse, Page
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import get_current_admin
+from app.core.pagination import build_page, decode_cursor, page_limit, row_id
 
 router = APIRouter(prefix="/api/health-tips", tags=["health-tips"])
 
-@router.get("", response_model=List[HealthTipResponse])
-def get_health_tips(db: Session = Depends(get_db)):
-    tips = db.query(HealthTip).all()
-    return tips
+# Serialized responses with their ETags. Keys carry the current version, so a
+# response built while create_health_tip runs can never be served afterwards.
+# They are rendered from the primary: a lagging replica would refill the cache
+# with the tips from before the invalidation for the whole TTL.
+_cache = TTLCache("health_tips", maxsize=1024, ttl=settings.HEALTH_TIPS_CACHE_TTL)
+_version = 0
+
+def invalidate_health_tips():
+    global _version
+    _version += 1
+    _cache.clear()
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+async def _cached_response(request: Request, key: Hashable, render: Callable[[], Awaitable[Optional[bytes]]]) -> Response:
+    cache_key = (_version,) + key
+    entry = _cache.get(cache_key)
+    if entry is None:
+        body = await render()
+        if body is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Health tip not found"
+            )
+        entry = (body, f'"{hashlib.sha1(body).hexdigest()}"')
+        _cache.set(cache_key, entry)
+    
+    body, etag = entry
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={settings.HEALTH_TIPS_MAX_AGE}"}
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("", response_model=Page[HealthTipResponse])
+async def get_health_tips(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_db)
+):
+    query = select(HealthTip)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, row_id)
+        query = query.where(HealthTip.id > after_id)
+    
+    async def render() -> bytes:
+        tips = (await db.scalars(query.order_by(HealthTip.id).limit(limit + 1))).all()
+        page = build_page(tips, limit, lambda tip: [tip.id])
+        return Page[HealthTipResponse].model_validate(page).model_dump_json().encode()
+    
+    return await _cached_response(request, ("list", cursor, limit), render)
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=HealthTipResponse)
-def create_health_tip(
+async def create_health_tip(
     tip_data: HealthTipCreate,
     current_user = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     new_tip = HealthTip(
         title=tip_data.title,
         content=tip_data.content
     )
     db.add(new_tip)
-    db.commit()
-    db.refresh(new_tip)
+    await db.commit()
+    await db.refresh(new_tip)
+    invalidate_health_tips()
     return new_tip
 
 @router.get("/{tip_id}", response_model=HealthTipResponse)
-def get_health_tip_by_id(tip_id: int, db: Session = Depends(get_db)):
-    tip = db.query(HealthTip).filter(HealthTip.id == tip_id).first()
-    if not tip:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Health tip not found"
-        )
-    return tip
-
+async def get_health_tip_by_id(tip_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    async def render() -> Optional[bytes]:
+        tip = await db.get(HealthTip, tip_id)
+        if not tip:
+            return None
+        return HealthTipResponse.model_validate(tip).model_dump_json().encode()
+    
+    return await _cached_response(request, ("tip", tip_id), render)
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from app.core import metrics
+from app.db.database import get_pool_status, read_replicas
+
+router = APIRouter(prefix="/api/internal", tags=["internal"])
+
+@router.get("/metrics")
+async def get_metrics():
+    """Per-worker pool usage and the in-process counters and latencies"""
+    return {
+        "db_pool": get_pool_status(),
+        "db_replicas": read_replicas.status(),
+        "metrics": metrics.snapshot(),
+    }
@@ -0,0 +1,9 @@
+from fastapi import APIRouter, Response
+from app.core import prometheus
+
+router = APIRouter(tags=["internal"])
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus scrape target, summed over every worker when METRICS_MULTIPROC_DIR is set"""
+    return Response(prometheus.render(), media_type=prometheus.CONTENT_TYPE)
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.db.database import get_db
-from app.models.models import ProgressLog, User
-from app.schemas.schemas import ProgressLogResponse
-from pydantic import BaseModel
-from typing import Optional
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, Date, DateTime, cast, distinct, func, literal, literal_column, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Literal, Optional
+from app.core.config import settings
+from app.core.events import notify
+from app.core.responses import trusted_json
+from app.db.database import get_db, get_read_db
+from app.db.rollups import refresh_rollups
+from app.models.models import Assignment, ProgressLog, ProgressRollup, User, Workout
+from app.schemas.schemas import (
+    Page, ProgressBulkResponse, ProgressLogResponse, ProgressRollupResponse, ProgressSummary
+)
+from app.core.pagination import build_page, decode_cursor, iso_date, page_limit, row_id
+from pydantic import BaseModel, ValidationError
 from datetime import date
 
 class ProgressLogCreateWithClient(BaseModel):
@@ -18,42 +30,289 @@ from app.core.simple_auth import get_user_by_id
 
 router = APIRouter(prefix="/api/progress", tags=["progress"])
 
-@router.get("", response_model=List[ProgressLogResponse])
-def get_progress_logs(
+# Exactly the ProgressLogResponse fields, so rows built from them can skip validation
+LOG_COLUMNS = (
+    ProgressLog.id, ProgressLog.client_id, ProgressLog.date,
+    ProgressLog.weight, ProgressLog.calories, ProgressLog.notes
+)
+
+async def trainers_of_clients(db: AsyncSession, client_ids) -> List[int]:
+    """Trainers whose workouts are assigned to any of the clients"""
+    return list(await db.scalars(
+        select(distinct(Workout.trainer_id))
+        .join(Assignment, Assignment.workout_id == Workout.id)
+        .where(Assignment.client_id.in_(client_ids))
+    ))
+
+@router.get("", response_model=Page[ProgressLogResponse])
+async def get_progress_logs(
     client_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_read_db)
 ):
     # Simple - filter by client_id if provided, otherwise return all
+    query = select(*LOG_COLUMNS)
     if client_id:
-        logs = db.query(ProgressLog).filter(ProgressLog.client_id == client_id).order_by(ProgressLog.date.desc()).all()
+        query = query.where(ProgressLog.client_id == client_id)
+    
+    # Newest first; (date, id) keeps the order stable across equal dates
+    if cursor:
+        before_date, before_id = decode_cursor(cursor, iso_date, row_id)
+        query = query.where(tuple_(ProgressLog.date, ProgressLog.id) < (before_date, before_id))
+    
+    query = query.order_by(ProgressLog.date.desc(), ProgressLog.id.desc()).limit(limit + 1)
+    logs = [row._asdict() for row in await db.execute(query)]
+    return trusted_json(build_page(logs, limit, lambda log: [log["date"].isoformat(), log["id"]]))
+
+EXPORT_COLUMNS = ("id", "client_id", "date", "weight", "calories", "notes")
+
+async def _ndjson_chunks(db: AsyncSession, query) -> AsyncIterator[str]:
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        lines = []
+        for row in rows:
+            record = row._asdict()
+            record["date"] = record["date"].isoformat()
+            lines.append(json.dumps(record))
+        yield "\n".join(lines) + "\n"
+
+async def _csv_chunks(db: AsyncSession, query) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+@router.get("/export")
+async def export_progress_logs(
+    client_id: Optional[int] = None,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Stream progress logs oldest first, read through a server-side cursor"""
+    query = select(*(getattr(ProgressLog, column) for column in EXPORT_COLUMNS))
+    if client_id:
+        query = query.where(ProgressLog.client_id == client_id)
+    query = query.order_by(ProgressLog.date, ProgressLog.id).execution_options(
+        yield_per=settings.EXPORT_BATCH_SIZE
+    )
+    
+    if format == "csv":
+        chunks, media_type = _csv_chunks(db, query), "text/csv"
     else:
-        logs = db.query(ProgressLog).order_by(ProgressLog.date.desc()).all()
+        chunks, media_type = _ndjson_chunks(db, query), "application/x-ndjson"
+    filename = f"progress_logs_{client_id}.{format}" if client_id else f"progress_logs.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/summary", response_model=ProgressSummary)
+async def get_progress_summary(
+    client_id: int,
+    bucket: Literal["week", "month"] = "week",
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Weight and calorie statistics per week or month, aggregated in Postgres"""
+    # Rendered inline so the SELECT and GROUP BY expressions are identical
+    field = literal(bucket, literal_execute=True)
+    period_start = cast(func.date_trunc(field, cast(ProgressLog.date, DateTime)), Date).label("period_start")
+    buckets = select(
+        period_start,
+        func.count().label("log_count"),
+        func.min(ProgressLog.weight).label("min_weight"),
+        func.max(ProgressLog.weight).label("max_weight"),
+        func.avg(ProgressLog.weight).label("avg_weight"),
+        func.sum(ProgressLog.calories).label("total_calories")
+    ).where(ProgressLog.client_id == client_id).group_by(period_start).subquery()
+    
+    previous = dict(order_by=buckets.c.period_start)
+    query = select(
+        buckets,
+        (buckets.c.avg_weight - func.lag(buckets.c.avg_weight).over(**previous)).label("weight_delta"),
+        (buckets.c.total_calories - func.lag(buckets.c.total_calories).over(**previous)).label("calories_delta")
+    ).order_by(buckets.c.period_start)
+    
+    result = await db.execute(query)
+    return trusted_json({
+        "client_id": client_id,
+        "bucket": bucket,
+        "buckets": [row._asdict() for row in result]
+    })
+
+@router.get("/rollups", response_model=List[ProgressRollupResponse])
+async def get_progress_rollups(
+    client_id: List[int] = Query(...),
+    period: Literal["day", "week"] = "week",
+    since: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Precomputed per-client buckets, for views that cover many clients at once"""
+    query = select(
+        ProgressRollup.client_id,
+        ProgressRollup.period,
+        ProgressRollup.period_start,
+        ProgressRollup.log_count,
+        ProgressRollup.calorie_sum.label("total_calories"),
+        (ProgressRollup.weight_sum / func.nullif(ProgressRollup.weight_count, 0)).label("avg_weight"),
+        ProgressRollup.latest_weight,
+        ProgressRollup.latest_weight_date
+    ).where(ProgressRollup.client_id.in_(client_id), ProgressRollup.period == period)
+    if since:
+        query = query.where(ProgressRollup.period_start >= since)
     
-    return logs
+    query = query.order_by(ProgressRollup.client_id, ProgressRollup.period_start)
+    result = await db.execute(query)
+    return trusted_json([row._asdict() for row in result])
+
+UPSERT_COLUMNS = ("weight", "calories", "notes")
+
+def _upsert_logs(*returning):
+    """INSERT that updates the client's log for that day in place when there already is one"""
+    statement = insert(ProgressLog.__table__)
+    return statement.on_conflict_do_update(
+        constraint="unique_client_date",
+        set_={column: statement.excluded[column] for column in UPSERT_COLUMNS}
+    ).returning(
+        *returning,
+        # xmax is only zero on rows this statement inserted rather than updated
+        literal_column("xmax = 0", Boolean).label("created")
+    )
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=ProgressLogResponse)
-def create_progress_log(
+async def create_progress_log(
     log_data: ProgressLogCreateWithClient,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
-    new_log = ProgressLog(
-        client_id=log_data.client_id,
-        date=log_data.date,
-        weight=log_data.weight,
-        calories=log_data.calories,
-        notes=log_data.notes
+    """Log a day's progress; a second log for the same day replaces the first (200 instead of 201)"""
+    row = (await db.execute(_upsert_logs(*LOG_COLUMNS).values(log_data.model_dump()))).one()
+    await refresh_rollups(db, {row.client_id: [row.date]})
+    await db.commit()
+    
+    if not row.created:
+        response.status_code = status.HTTP_200_OK
+    await notify(
+        "progress_log.created" if row.created else "progress_log.updated",
+        {"id": row.id, "client_id": row.client_id},
+        trainer_ids=await trainers_of_clients(db, [row.client_id]),
+        client_ids=[row.client_id]
     )
-    db.add(new_log)
-    db.commit()
-    db.refresh(new_log)
-    return new_log
+    return row._asdict()
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl")
+
+@router.post("/bulk", response_model=ProgressBulkResponse)
+async def bulk_upsert_progress_logs(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create or update many logs in one transaction, one log per client and date.
+    
+    The body is a JSON array or NDJSON (application/x-ndjson). When an item repeats
+    a client and date, the later item wins and the earlier one is marked superseded.
+    """
+    body = await request.body()
+    ndjson = request.headers.get("content-type", "").startswith(NDJSON_TYPES)
+    if ndjson:
+        raw_items = [line for line in body.splitlines() if line.strip()]
+    else:
+        try:
+            raw_items = json.loads(body)
+        except ValueError:
+            raw_items = None
+        if not isinstance(raw_items, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Body must be a JSON array or NDJSON"
+            )
+    if len(raw_items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_ITEMS} items per request"
+        )
+    
+    results = [None] * len(raw_items)
+    items = {}  # (client_id, date) -> (index, item), last one wins
+    for index, raw in enumerate(raw_items):
+        try:
+            if ndjson:
+                item = ProgressLogCreateWithClient.model_validate_json(raw)
+            else:
+                item = ProgressLogCreateWithClient.model_validate(raw)
+        except ValidationError as e:
+            results[index] = {"index": index, "status": "error",
+                              "detail": e.errors(include_url=False, include_context=False)}
+            continue
+        key = (item.client_id, item.date)
+        if key in items:
+            earlier = items[key][0]
+            results[earlier] = {"index": earlier, "status": "superseded",
+                                "detail": f"Replaced by item {index}"}
+        items[key] = (index, item)
+    
+    # One query for every referenced client instead of one per item
+    client_ids = {client_id for client_id, _ in items}
+    known_clients = set()
+    if client_ids:
+        known_clients = set(await db.scalars(
+            select(User.id).where(User.id.in_(client_ids), User.role == "client")
+        ))
+    rows = []
+    for (client_id, _), (index, item) in items.items():
+        if client_id in known_clients:
+            rows.append(item.model_dump())
+        else:
+            results[index] = {"index": index, "status": "error", "detail": "Client not found"}
+    
+    written = {}
+    if rows:
+        statement = _upsert_logs(ProgressLog.id, ProgressLog.client_id, ProgressLog.date).execution_options(
+            insertmanyvalues_page_size=settings.BULK_BATCH_SIZE
+        )
+        result = await db.execute(statement, rows)
+        written = {(row.client_id, row.date): row for row in result}
+        
+        days_by_client = {}
+        for client_id, day in written:
+            days_by_client.setdefault(client_id, []).append(day)
+        await refresh_rollups(db, days_by_client)
+        await db.commit()
+        
+        await notify(
+            "progress_log.bulk",
+            {"client_ids": sorted(days_by_client)},
+            trainer_ids=await trainers_of_clients(db, days_by_client),
+            client_ids=days_by_client
+        )
+    
+    counts = {"created": 0, "updated": 0}
+    for key, row in written.items():
+        index = items[key][0]
+        outcome = "created" if row.created else "updated"
+        counts[outcome] += 1
+        results[index] = {"index": index, "status": outcome, "id": row.id}
+    
+    return {
+        **counts,
+        "failed": sum(1 for result in results if result["status"] == "error"),
+        "results": results
+    }
 
 @router.get("/{log_id}", response_model=ProgressLogResponse)
-def get_progress_log_by_id(
+async def get_progress_log_by_id(
     log_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    log = db.query(ProgressLog).filter(ProgressLog.id == log_id).first()
+    log = await db.get(ProgressLog, log_id)
     if not log:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -62,19 +321,26 @@ def get_progress_log_by_id(
     return log
 
 @router.delete("/{log_id}", status_code=status.HTTP_200_OK)
-def delete_progress_log(
+async def delete_progress_log(
     log_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    log = db.query(ProgressLog).filter(ProgressLog.id == log_id).first()
+    log = await db.get(ProgressLog, log_id)
     if not log:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Progress log not found"
         )
     
-    db.delete(log)
-    db.commit()
+    await db.delete(log)
+    await db.flush()
+    await refresh_rollups(db, {log.client_id: [log.date]})
+    await db.commit()
     
+    await notify(
+        "progress_log.deleted",
+        {"id": log_id, "client_id": log.client_id},
+        trainer_ids=await trainers_of_clients(db, [log.client_id]),
+        client_ids=[log.client_id]
+    )
     return {"message": "Progress log deleted successfully"}
-
@@ -0,0 +1,151 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import BigInteger, Text, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.config import settings
+from app.core.pagination import big_row_id, decode_cursor_shapes, encode_cursor, revision, row_id
+from app.core.responses import trusted_json
+from app.core.simple_auth import get_user_by_id
+from app.db.database import get_db
+from app.models.models import Assignment, ProgressLog, SyncTombstone, Workout
+from app.routes.assignments import assignment_listing_query
+from app.routes.progress import LOG_COLUMNS
+from app.routes.workouts import workout_listing_query
+from app.schemas.schemas import SyncChanges
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+# A sync token is [floor]. While an incremental sync is split over several
+# responses it is [floor, horizon, last progress log id, last tombstone id]: the
+# next call goes on where this one stopped, and the last one hands out [horizon].
+TOKEN = (revision,)
+PAGED_TOKEN = (revision, revision, row_id, big_row_id)
+
+async def _horizon(db: AsyncSession) -> int:
+    """Revisions are transaction ids. Every transaction older than the snapshot's
+    xmin has finished, so its rows are visible to any later read. Transactions
+    at or after xmin may still be running, so the next sync starts from there.
+    """
+    xmin = func.pg_snapshot_xmin(func.pg_current_snapshot())
+    return await db.scalar(select(xmin.cast(Text).cast(BigInteger)))
+
+async def current_sync_token(db: AsyncSession) -> str:
+    """Token for "everything committed so far"; take it before reading the rows"""
+    return encode_cursor([await _horizon(db)])
+
+def _changed(query, since: Optional[int], *revisions):
+    if since is None:
+        return query
+    return query.where(or_(*(column >= since for column in revisions)))
+
+async def _rows(db: AsyncSession, query) -> list:
+    return [row._asdict() for row in await db.execute(query)]
+
+@router.get("", response_model=SyncChanges)
+async def sync_changes(
+    user_id: int,
+    since: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Rows visible to the user that changed since the token, plus deleted ids.
+    
+    Without since, everything visible is returned - except progress logs for
+    trainers and admins, who can see every client's: like the dashboard, they get
+    the newest DASHBOARD_LOG_LIMIT. Later syncs then return every changed log,
+    including older ones that full sync left out.
+    
+    With since, changed progress logs and deletes come SYNC_PAGE_SIZE at a time.
+    While has_more is true, call again with the returned token; the following
+    pages hold only progress logs and deletes. A row can show up again in a
+    later call, so apply deletes first and then upsert the changed rows by id.
+    """
+    token = decode_cursor_shapes(since, TOKEN, PAGED_TOKEN) if since else [None]
+    floor = token[0]
+    user = await get_user_by_id(user_id, db)
+    first_page = len(token) != len(PAGED_TOKEN)
+    if first_page:
+        horizon, after_log, after_tombstone = await _horizon(db), 0, 0
+    else:
+        _, horizon, after_log, after_tombstone = token
+    
+    tombstones = select(
+        SyncTombstone.id, SyncTombstone.table_name, SyncTombstone.row_id, SyncTombstone.workout_id
+    )
+    if user.role == "trainer" or user.role == "admin":
+        workouts = workout_listing_query().where(Workout.trainer_id == user.id)
+        assignments = assignment_listing_query()
+        visible_deletes = [
+            and_(SyncTombstone.table_name == "workouts", SyncTombstone.trainer_id == user.id),
+            SyncTombstone.table_name == "progress_logs"
+        ]
+        if user.role == "trainer":
+            assignments = assignments.where(Workout.trainer_id == user.id)
+            visible_deletes.append(and_(
+                SyncTombstone.table_name == "assignments", SyncTombstone.trainer_id == user.id
+            ))
+        else:
+            visible_deletes.append(SyncTombstone.table_name == "assignments")
+        if floor is None:
+            logs = select(*LOG_COLUMNS).order_by(
+                ProgressLog.date.desc(), ProgressLog.id.desc()
+            ).limit(settings.DASHBOARD_LOG_LIMIT)
+        else:
+            logs = select(*LOG_COLUMNS).order_by(ProgressLog.id)
+        workouts = _changed(workouts, floor, Workout.revision)
+    else:
+        # A client sees a workout through its assignment, so a new assignment
+        # makes an unchanged workout appear
+        workouts = workout_listing_query().join(
+            Assignment, Assignment.workout_id == Workout.id
+        ).where(Assignment.client_id == user.id)
+        workouts = _changed(workouts, floor, Workout.revision, Assignment.revision)
+        assignments = assignment_listing_query().where(Assignment.client_id == user.id)
+        visible_deletes = [and_(
+            SyncTombstone.table_name.in_(["assignments", "progress_logs"]),
+            SyncTombstone.client_id == user.id
+        )]
+        logs = select(*LOG_COLUMNS).where(ProgressLog.client_id == user.id).order_by(ProgressLog.id)
+    
+    changes = {
+        "sync_token": encode_cursor([horizon]),
+        "has_more": False,
+        "workouts": [],
+        "assignments": [],
+        "progress_logs": [],
+        "deleted": {"workouts": [], "assignments": [], "progress_logs": []}
+    }
+    if first_page:
+        changes["workouts"] = await _rows(db, workouts.order_by(Workout.id))
+        # Assignment rows carry the workout title, so a renamed workout resends them too
+        changes["assignments"] = await _rows(db, _changed(
+            assignments, floor, Assignment.revision, Workout.revision
+        ).order_by(Assignment.id))
+    if floor is None:
+        changes["progress_logs"] = await _rows(db, logs)
+        return trusted_json(changes)
+    
+    page_size = settings.SYNC_PAGE_SIZE
+    logs = _changed(logs, floor, ProgressLog.revision).where(ProgressLog.id > after_log)
+    changed_logs = await _rows(db, logs.limit(page_size + 1))
+    query = tombstones.where(
+        SyncTombstone.revision >= floor, SyncTombstone.id > after_tombstone, or_(*visible_deletes)
+    )
+    removed = (await db.execute(query.order_by(SyncTombstone.id).limit(page_size + 1))).all()
+    
+    if len(changed_logs) > page_size or len(removed) > page_size:
+        changed_logs, removed = changed_logs[:page_size], removed[:page_size]
+        if changed_logs:
+            after_log = changed_logs[-1]["id"]
+        if removed:
+            after_tombstone = removed[-1].id
+        changes["has_more"] = True
+        changes["sync_token"] = encode_cursor([floor, horizon, after_log, after_tombstone])
+    
+    changes["progress_logs"] = changed_logs
+    deleted = changes["deleted"]
+    for _, table_name, deleted_id, workout_id in removed:
+        deleted[table_name].append(deleted_id)
+        if table_name == "assignments" and user.role == "client":
+            # Unassigned workouts disappear from the client's list
+            deleted["workouts"].append(workout_id)
+    return trusted_json(changes)
@@ -1,29 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.db.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.db.database import get_read_db
 from app.models.models import User
-from app.schemas.schemas import UserResponse
+from app.schemas.schemas import Page, UserResponse
+from app.core.pagination import build_page, decode_cursor, page_limit, row_id
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
-@router.get("", response_model=List[UserResponse])
-def get_all_users(db: Session = Depends(get_db)):
-    users = db.query(User).all()
-    return users
+async def _user_page(db: AsyncSession, query, cursor: Optional[str], limit: int) -> dict:
+    if cursor:
+        (after_id,) = decode_cursor(cursor, row_id)
+        query = query.where(User.id > after_id)
+    users = (await db.scalars(query.order_by(User.id).limit(limit + 1))).all()
+    return build_page(users, limit, lambda user: [user.id])
 
-@router.get("/clients", response_model=List[UserResponse])
-def get_all_clients(db: Session = Depends(get_db)):
-    clients = db.query(User).filter(User.role == "client").all()
-    return clients
+@router.get("", response_model=Page[UserResponse])
+async def get_all_users(
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_read_db)
+):
+    return await _user_page(db, select(User), cursor, limit)
+
+@router.get("/clients", response_model=Page[UserResponse])
+async def get_all_clients(
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_read_db)
+):
+    return await _user_page(db, select(User).where(User.role == "client"), cursor, limit)
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user_by_id(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def get_user_by_id(user_id: int, db: AsyncSession = Depends(get_read_db)):
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     return user
-
@@ -1,58 +1,108 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+import re
+from sqlalchemy import cast, func, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.db.database import get_db
+from app.core.events import notify
+from app.core.responses import trusted_json
+from app.db.database import get_db, get_read_db
 from app.models.models import Workout, User, Assignment
-from app.schemas.schemas import WorkoutCreate, WorkoutUpdate, WorkoutResponse
+from app.schemas.schemas import WorkoutCreate, WorkoutUpdate, WorkoutResponse, Page
 from app.core.simple_auth import get_user_by_id
+from app.core.pagination import build_page, decode_cursor, page_limit, row_id
 
 router = APIRouter(prefix="/api/workouts", tags=["workouts"])
 
-@router.get("", response_model=List[WorkoutResponse])
-def get_workouts(
+def workout_listing_query():
+    """Workout columns plus the trainer's name, fetched with a single JOIN"""
+    return select(
+        Workout.id,
+        Workout.trainer_id,
+        Workout.title,
+        Workout.description,
+        User.name.label("trainer_name")
+    ).join(User, User.id == Workout.trainer_id)
+
+@router.get("", response_model=Page[WorkoutResponse])
+async def get_workouts(
     user_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_read_db)
 ):
+    query = workout_listing_query()
+    
     # If user_id provided, filter by user role
     if user_id:
-        user = get_user_by_id(user_id, db)
+        user = await get_user_by_id(user_id, db)
         if user.role == "trainer" or user.role == "admin":
-            workouts = db.query(Workout).filter(Workout.trainer_id == user.id).all()
+            query = query.where(Workout.trainer_id == user.id)
         else:
             # Clients see assigned workouts
-            assignments = db.query(Assignment).filter(Assignment.client_id == user.id).all()
-            workout_ids = [a.workout_id for a in assignments] if assignments else []
-            if workout_ids:
-                workouts = db.query(Workout).filter(Workout.id.in_(workout_ids)).all()
-            else:
-                workouts = []
-    else:
-        # No user_id - return all workouts
-        workouts = db.query(Workout).all()
-    
-    # Add trainer name to each workout
-    result = []
-    for workout in workouts:
-        trainer = db.query(User).filter(User.id == workout.trainer_id).first()
-        workout_dict = {
-            "id": workout.id,
-            "trainer_id": workout.trainer_id,
-            "title": workout.title,
-            "description": workout.description,
-            "trainer_name": trainer.name if trainer else None
-        }
-        result.append(workout_dict)
-    
-    return result
+            query = query.join(Assignment, Assignment.workout_id == Workout.id).where(
+                Assignment.client_id == user.id
+            )
+    
+    if cursor:
+        (after_id,) = decode_cursor(cursor, row_id)
+        query = query.where(Workout.id > after_id)
+    
+    result = await db.execute(query.order_by(Workout.id).limit(limit + 1))
+    rows = [row._asdict() for row in result]
+    return trusted_json(build_page(rows, limit, lambda row: [row["id"]]))
+
+async def assigned_client_ids(db: AsyncSession, workout_id: int) -> List[int]:
+    return list(await db.scalars(select(Assignment.client_id).where(Assignment.workout_id == workout_id)))
+
+# Must match the configuration of Workout.search_vector. 'simple' doesn't stem,
+# so a typed prefix like "squa" still matches "squats".
+SEARCH_CONFIG = "simple"
+
+def prefix_tsquery(text: str) -> Optional[str]:
+    """'upper bod' -> 'upper:* & bod:*'; None when there is nothing to search for"""
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+@router.get("/search", response_model=List[WorkoutResponse])
+async def search_workouts(
+    q: str = Query(..., min_length=1, max_length=200),
+    user_id: Optional[int] = None,
+    limit: int = Depends(page_limit),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Best matches for q over titles and descriptions, title hits ranked first"""
+    terms = prefix_tsquery(q)
+    if not terms:
+        return []
+    
+    tsquery = func.to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), terms)
+    query = workout_listing_query().where(Workout.search_vector.op("@@")(tsquery))
+    
+    # Same scoping as the listing endpoint
+    if user_id:
+        user = await get_user_by_id(user_id, db)
+        if user.role == "trainer" or user.role == "admin":
+            query = query.where(Workout.trainer_id == user.id)
+        else:
+            query = query.join(Assignment, Assignment.workout_id == Workout.id).where(
+                Assignment.client_id == user.id
+            )
+    
+    rank = func.ts_rank_cd(Workout.search_vector, tsquery)
+    result = await db.execute(query.order_by(rank.desc(), Workout.id).limit(limit))
+    return trusted_json([row._asdict() for row in result])
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=WorkoutResponse)
-def create_workout(
+async def create_workout(
     workout_data: WorkoutCreate,
     trainer_id: int = Query(..., description="Trainer ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Verify trainer exists
-    trainer = get_user_by_id(trainer_id, db)
+    trainer = await get_user_by_id(trainer_id, db)
     if trainer.role != "trainer" and trainer.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -65,8 +115,10 @@ def create_workout(
         description=workout_data.description
     )
     db.add(new_workout)
-    db.commit()
-    db.refresh(new_workout)
+    await db.commit()
+    await db.refresh(new_workout)
+    
+    await notify("workout.created", {"id": new_workout.id}, trainer_ids=[new_workout.trainer_id])
     
     return {
         "id": new_workout.id,
@@ -77,41 +129,35 @@ def create_workout(
     }
 
 @router.get("/{workout_id}", response_model=WorkoutResponse)
-def get_workout_by_id(
+async def get_workout_by_id(
     workout_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    workout = db.query(Workout).filter(Workout.id == workout_id).first()
+    result = await db.execute(workout_listing_query().where(Workout.id == workout_id))
+    workout = result.first()
     if not workout:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Workout not found"
         )
     
-    trainer = db.query(User).filter(User.id == workout.trainer_id).first()
-    return {
-        "id": workout.id,
-        "trainer_id": workout.trainer_id,
-        "title": workout.title,
-        "description": workout.description,
-        "trainer_name": trainer.name if trainer else None
-    }
+    return workout._asdict()
 
 @router.put("/{workout_id}", response_model=WorkoutResponse)
-def update_workout(
+async def update_workout(
     workout_id: int,
     workout_data: WorkoutUpdate,
     trainer_id: int = Query(..., description="Trainer ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    workout = db.query(Workout).filter(Workout.id == workout_id).first()
+    workout = await db.get(Workout, workout_id)
     if not workout:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Workout not found"
         )
     
-    trainer = get_user_by_id(trainer_id, db)
+    trainer = await get_user_by_id(trainer_id, db)
     if workout.trainer_id != trainer_id and trainer.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -123,8 +169,15 @@ def update_workout(
     if workout_data.description is not None:
         workout.description = workout_data.description
     
-    db.commit()
-    db.refresh(workout)
+    await db.commit()
+    await db.refresh(workout)
+    
+    await notify(
+        "workout.updated",
+        {"id": workout.id},
+        trainer_ids=[workout.trainer_id],
+        client_ids=await assigned_client_ids(db, workout.id)
+    )
     
     return {
         "id": workout.id,
@@ -135,27 +188,34 @@ def update_workout(
     }
 
 @router.delete("/{workout_id}", status_code=status.HTTP_200_OK)
-def delete_workout(
+async def delete_workout(
     workout_id: int,
     trainer_id: int = Query(..., description="Trainer ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    workout = db.query(Workout).filter(Workout.id == workout_id).first()
+    workout = await db.get(Workout, workout_id)
     if not workout:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Workout not found"
         )
     
-    trainer = get_user_by_id(trainer_id, db)
+    trainer = await get_user_by_id(trainer_id, db)
     if workout.trainer_id != trainer_id and trainer.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this workout"
         )
     
-    db.delete(workout)
-    db.commit()
+    client_ids = await assigned_client_ids(db, workout.id)
+    await db.delete(workout)
+    await db.commit()
+    
+    await notify(
+        "workout.deleted",
+        {"id": workout_id},
+        trainer_ids=[workout.trainer_id],
+        client_ids=client_ids
+    )
     
     return {"message": "Workout deleted successfully"}
-
@@ -1,7 +1,14 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Any, Generic, List, Literal, Optional, TypeVar
 from datetime import date, datetime
 
+T = TypeVar("T")
+
+# Pagination
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 # User Schemas
 class UserCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -61,6 +68,18 @@ class AssignmentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class AssignmentBatchCreate(BaseModel):
+    client_ids: List[int] = Field(..., min_length=1)
+    workout_ids: List[int] = Field(..., min_length=1)
+
+class AssignmentPair(BaseModel):
+    client_id: int
+    workout_id: int
+
+class AssignmentBatchResponse(BaseModel):
+    created: List[AssignmentResponse]
+    skipped: List[AssignmentPair]  # already assigned
+
 # Progress Log Schemas
 class ProgressLogCreate(BaseModel):
     date: date
@@ -79,6 +98,72 @@ class ProgressLogResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ProgressBulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "updated", "superseded", "error"]
+    id: Optional[int] = None
+    detail: Optional[Any] = None
+
+class ProgressBulkResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[ProgressBulkItemResult]
+
+class ProgressSummaryBucket(BaseModel):
+    period_start: date
+    log_count: int
+    min_weight: Optional[float]
+    max_weight: Optional[float]
+    avg_weight: Optional[float]
+    total_calories: Optional[int]
+    weight_delta: Optional[float]
+    calories_delta: Optional[int]
+
+class ProgressSummary(BaseModel):
+    client_id: int
+    bucket: str
+    buckets: List[ProgressSummaryBucket]
+
+class ProgressRollupResponse(BaseModel):
+    client_id: int
+    period: str
+    period_start: date
+    log_count: int
+    total_calories: int
+    avg_weight: Optional[float]
+    latest_weight: Optional[float]
+    latest_weight_date: Optional[date]
+
+# Dashboard Schemas
+class TrainerDashboard(BaseModel):
+    user: UserResponse
+    sync_token: str  # pass to /api/sync to fetch later changes
+    clients: List[UserResponse]
+    workouts: List[WorkoutResponse]
+    assignments: List[AssignmentResponse]
+    progress_logs: List[ProgressLogResponse]  # newest first, capped
+
+class ClientDashboard(BaseModel):
+    user: UserResponse
+    sync_token: str
+    workouts: List[WorkoutResponse]
+    progress_logs: List[ProgressLogResponse]  # newest first
+
+# Sync Schemas
+class SyncDeleted(BaseModel):
+    workouts: List[int] = []
+    assignments: List[int] = []
+    progress_logs: List[int] = []
+
+class SyncChanges(BaseModel):
+    sync_token: str
+    has_more: bool = False  # call again with sync_token for the rest of this sync
+    workouts: List[WorkoutResponse]
+    assignments: List[AssignmentResponse]
+    progress_logs: List[ProgressLogResponse]
+    deleted: SyncDeleted
+
 # Health Tip Schemas
 class HealthTipCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
@@ -0,0 +1,69 @@
+"""
+Compare two benchmarks.load result files, endpoint by endpoint.
+
+    python -m benchmarks.compare before.json after.json [--threshold 10]
+
+Exits with status 1 when any endpoint's p95 latency or throughput got worse by
+more than the threshold percentage, or when it now runs more queries per request.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+def change(before: float, after: float) -> Optional[float]:
+    """Percentage change, or None when there is no baseline"""
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+def _format(value: Optional[float]) -> str:
+    return "     n/a" if value is None else f"{value:+7.1f}%"
+
+def compare(before: dict, after: dict, threshold: float) -> List[str]:
+    """Print a table of changes; returns the regressions"""
+    regressions = []
+    print(f"{(before['meta'].get('commit') or '?')[:12]} -> {(after['meta'].get('commit') or '?')[:12]}")
+    print(f"{'endpoint':<20} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9} {'queries':>9}")
+
+    names = list(before["endpoints"]) + [name for name in after["endpoints"] if name not in before["endpoints"]]
+    for name in names + ["total"]:
+        old = before["total"] if name == "total" else before["endpoints"].get(name)
+        new = after["total"] if name == "total" else after["endpoints"].get(name)
+        if old is None or new is None:
+            print(f"{name:<20} only in {'after' if old is None else 'before'}")
+            continue
+
+        latency = {q: change(old["latency_ms"][q], new["latency_ms"][q]) for q in ("p50", "p95", "p99")}
+        throughput = change(old["throughput_rps"], new["throughput_rps"])
+        old_queries = (old.get("queries") or {}).get("median")
+        new_queries = (new.get("queries") or {}).get("median")
+        queries = "-" if old_queries is None or new_queries is None else f"{old_queries:g}->{new_queries:g}"
+        print(f"{name:<20} {_format(latency['p50'])} {_format(latency['p95'])} {_format(latency['p99'])} "
+              f"{_format(throughput)} {queries:>9}")
+
+        if latency["p95"] is not None and latency["p95"] > threshold:
+            regressions.append(f"{name}: p95 {old['latency_ms']['p95']:.1f}ms -> {new['latency_ms']['p95']:.1f}ms")
+        if throughput is not None and throughput < -threshold:
+            regressions.append(f"{name}: {old['throughput_rps']:.1f} -> {new['throughput_rps']:.1f} requests/s")
+        if old_queries is not None and new_queries is not None and new_queries > old_queries:
+            regressions.append(f"{name}: {old_queries:g} -> {new_queries:g} queries per request")
+        if new["errors"] > old["errors"]:
+            regressions.append(f"{name}: {old['errors']} -> {new['errors']} errors")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+
+    with open(args.before) as before, open(args.after) as after:
+        regressions = compare(json.load(before), json.load(after), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions over {args.threshold:g}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nNo regressions")
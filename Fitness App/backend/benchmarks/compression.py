@@ -0,0 +1,132 @@
+"""
+Compression cost against bytes saved, per payload and content-coding.
+
+Fetches real responses from a seeded database (python seed.py --clear --scale 1)
+uncompressed, then compresses each with the encoders app.core.compression uses:
+
+    python -m benchmarks.compression
+    python -m benchmarks.compression --url http://localhost:8000 --mbps 5 --output compression.json
+
+The export is compressed in EXPORT_BATCH_SIZE-row chunks with a flush after
+each, as the middleware streams it. "net ms" is the transfer time saved on a
+--mbps link minus the CPU time spent compressing; br and zstd rows only appear
+when the brotli and zstandard packages are installed.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import httpx
+from app.core import compression
+from app.core.config import settings
+from app.db.database import engine
+from app.db.seeding import summary
+
+PAYLOADS: Dict[str, Callable[[int, int], str]] = {
+    "workouts_page": lambda trainer, client: f"/api/workouts?user_id={trainer}&limit={settings.MAX_PAGE_SIZE}",
+    "workouts_all": lambda trainer, client: f"/api/workouts?limit={settings.MAX_PAGE_SIZE}",
+    "assignments_page": lambda trainer, client: f"/api/assignments?user_id={trainer}&limit={settings.MAX_PAGE_SIZE}",
+    "progress_page": lambda trainer, client: f"/api/progress?client_id={client}&limit={settings.MAX_PAGE_SIZE}",
+    "client_dashboard": lambda trainer, client: f"/api/dashboard/client/{client}",
+    "progress_export": lambda trainer, client: f"/api/progress/export?client_id={client}",
+}
+
+def codecs() -> Dict[str, Callable[[], object]]:
+    """Label -> encoder factory for a few levels of each installed coding"""
+    available = {f"gzip-{level}": (lambda level=level: compression.GzipEncoder(level)) for level in (1, 6, 9)}
+    if compression.brotli is not None:
+        available.update({f"br-{quality}": (lambda quality=quality: compression.BrotliEncoder(quality)) for quality in (1, 4, 6)})
+    if compression.zstandard is not None:
+        available.update({f"zstd-{level}": (lambda level=level: compression.ZstdEncoder(level)) for level in (1, 3, 9)})
+    return available
+
+def chunked(body: bytes, lines: int) -> List[bytes]:
+    """An NDJSON body split into the chunks the export streams"""
+    rows = body.splitlines(keepends=True)
+    return [b"".join(rows[start:start + lines]) for start in range(0, len(rows), lines)] or [b""]
+
+def measure(factory: Callable[[], object], chunks: List[bytes], repeats: int) -> Tuple[int, float]:
+    """Compressed size and the best CPU seconds over repeats"""
+    best, size = float("inf"), 0
+    for _ in range(repeats):
+        started = time.process_time()
+        encoder = factory()
+        size = sum(len(encoder.compress(chunk, index == len(chunks) - 1)) for index, chunk in enumerate(chunks))
+        best = min(best, time.process_time() - started)
+    return size, best
+
+async def fetch(args) -> Dict[str, List[bytes]]:
+    with engine.connect() as connection:
+        roles = summary(connection)["roles"]
+    if "trainer" not in roles or "client" not in roles:
+        raise SystemExit("No synthetic users found - run python seed.py --clear --scale 1 first")
+    rng = random.Random(args.seed)
+    trainer = rng.randint(roles["trainer"]["first_id"], roles["trainer"]["last_id"])
+    client = rng.randint(roles["client"]["first_id"], roles["client"]["last_id"])
+
+    if args.url:
+        http = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        from app.main import app
+        http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=args.timeout)
+
+    payloads = {}
+    async with http:
+        for name, path in PAYLOADS.items():
+            response = await http.get(path(trainer, client), headers={"Accept-Encoding": "identity"})
+            response.raise_for_status()
+            body = response.content
+            payloads[name] = chunked(body, settings.EXPORT_BATCH_SIZE) if name == "progress_export" else [body]
+    return payloads
+
+def run(payloads: Dict[str, List[bytes]], args) -> List[dict]:
+    rows = []
+    for name, chunks in payloads.items():
+        original = sum(len(chunk) for chunk in chunks)
+        for label, factory in codecs().items():
+            size, seconds = measure(factory, chunks, args.repeats)
+            saved_ms = (original - size) * 8 / (args.mbps * 1000)
+            rows.append({
+                "payload": name,
+                "codec": label,
+                "chunks": len(chunks),
+                "bytes": original,
+                "compressed": size,
+                "ratio": original / size if size else 0.0,
+                "cpu_ms": seconds * 1000,
+                "mb_per_s": original / seconds / 1e6 if seconds else 0.0,
+                "net_ms": saved_ms - seconds * 1000,
+            })
+    return rows
+
+def print_report(rows: List[dict], mbps: float):
+    print(f"{'payload':<18} {'codec':<8} {'chunks':>6} {'bytes':>10} {'compressed':>10} {'ratio':>6} "
+          f"{'cpu ms':>8} {'MB/s':>8} {f'net ms @{mbps:g}Mbit':>16}")
+    for row in rows:
+        print(f"{row['payload']:<18} {row['codec']:<8} {row['chunks']:>6} {row['bytes']:>10} {row['compressed']:>10} "
+              f"{row['ratio']:>6.1f} {row['cpu_ms']:>8.2f} {row['mb_per_s']:>8.1f} {row['net_ms']:>16.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server; default calls the app in-process")
+    parser.add_argument("--mbps", type=float, default=10.0, help="client link speed for the net column")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="also write the rows as JSON")
+    args = parser.parse_args()
+
+    try:
+        payloads = asyncio.run(fetch(args))
+    finally:
+        if not args.url:
+            from app.core import hashing
+            hashing.shutdown()
+    rows = run(payloads, args)
+    print_report(rows, args.mbps)
+    if args.output:
+        Path(args.output).write_text(json.dumps({"mbps": args.mbps, "rows": rows}, indent=2))
+        print(f"Wrote {args.output}")
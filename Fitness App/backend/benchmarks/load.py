@@ -0,0 +1,237 @@
+"""
+Traffic replay - a weighted mix of dashboard, listing, search and login requests.
+
+Runs against a seeded population (python seed.py --clear --scale 100) and writes
+per-endpoint p50/p95/p99 latency, throughput, error counts and database
+queries per request as JSON, for benchmarks.compare:
+
+    python -m benchmarks.load --duration 30 --concurrency 32
+    python -m benchmarks.load --url http://localhost:8000 --output before.json
+
+Without --url the app is called in-process, sharing one event loop with the
+load generator, which is handy for comparing commits but not for absolute
+numbers. Query counts and database time come from each response's
+Server-Timing header.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import re
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import httpx
+from app.db.database import engine
+from app.db.seeding import MOVES, PASSWORDS, SEED_EMAIL_DOMAIN, STYLES, summary
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# (method, path, json body)
+Request = Tuple[str, str, Optional[dict]]
+
+class Sample(NamedTuple):
+    seconds: float
+    status: int  # 0 for transport errors
+    queries: Optional[int]
+    db_ms: Optional[float]
+
+SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+def parse_server_timing(header: Optional[str]) -> Tuple[Optional[int], Optional[float]]:
+    match = SERVER_TIMING_DB.search(header or "")
+    if match is None:
+        return None, None
+    return int(match.group(2)), float(match.group(1))
+
+class Users:
+    """Picks random trainers and clients from the seeded id ranges"""
+
+    def __init__(self, roles: dict):
+        self.trainers = (roles["trainer"]["first_id"], roles["trainer"]["last_id"])
+        self.clients = (roles["client"]["first_id"], roles["client"]["last_id"])
+
+    def trainer(self, rng: random.Random) -> int:
+        return rng.randint(*self.trainers)
+
+    def client(self, rng: random.Random) -> int:
+        return rng.randint(*self.clients)
+
+def _search_terms(rng: random.Random) -> str:
+    words = [rng.choice(MOVES).split()[0], rng.choice(STYLES).lower()]
+    return " ".join(words[:rng.randint(1, 2)])
+
+ENDPOINTS: Dict[str, Callable[[random.Random, Users], Request]] = {
+    "trainer_dashboard": lambda rng, users: ("GET", f"/api/dashboard/trainer/{users.trainer(rng)}", None),
+    "client_dashboard": lambda rng, users: ("GET", f"/api/dashboard/client/{users.client(rng)}", None),
+    "workouts_page": lambda rng, users: ("GET", f"/api/workouts?user_id={users.trainer(rng)}&limit=50", None),
+    "progress_page": lambda rng, users: ("GET", f"/api/progress?client_id={users.client(rng)}&limit=50", None),
+    "progress_summary": lambda rng, users: ("GET", f"/api/progress/summary?client_id={users.client(rng)}", None),
+    "workout_search": lambda rng, users: ("GET", f"/api/workouts/search?q={_search_terms(rng)}&limit=20", None),
+    "login": lambda rng, users: ("POST", "/api/auth/login", {
+        "email": f"client{users.client(rng)}@{SEED_EMAIL_DOMAIN}", "password": PASSWORDS["client"]
+    }),
+}
+
+DEFAULT_MIX = "trainer_dashboard=20,client_dashboard=30,workouts_page=10,progress_page=15,progress_summary=10,workout_search=10,login=5"
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint {name!r}, expected one of {', '.join(ENDPOINTS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+async def replay(client: httpx.AsyncClient, users: Users, weights: Dict[str, float], args) -> Tuple[dict, float]:
+    """Run the mix for warmup + duration seconds; returns samples per endpoint and the measured span"""
+    samples: Dict[str, List[Sample]] = {name: [] for name in weights}
+    names = list(weights)
+    cumulative = list(itertools.accumulate(weights.values()))
+
+    started = time.perf_counter()
+    measure_from = started + args.warmup
+    deadline = measure_from + args.duration
+
+    async def worker(number: int):
+        rng = random.Random(args.seed * 1000 + number)
+        while True:
+            name = rng.choices(names, cum_weights=cumulative)[0]
+            method, path, body = ENDPOINTS[name](rng, users)
+            start = time.perf_counter()
+            if start >= deadline:
+                return
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+                queries, db_ms = parse_server_timing(response.headers.get("server-timing"))
+            except httpx.HTTPError:
+                status, queries, db_ms = 0, None, None
+            if start >= measure_from:
+                samples[name].append(Sample(time.perf_counter() - start, status, queries, db_ms))
+
+    await asyncio.gather(*(worker(number) for number in range(args.concurrency)))
+    return samples, time.perf_counter() - measure_from
+
+def report(samples: Dict[str, List[Sample]], span: float) -> dict:
+    endpoints = {}
+    everything = []
+    for name, observed in samples.items():
+        latencies = sorted(sample.seconds * 1000 for sample in observed)
+        everything.extend(latencies)
+        timed = [sample for sample in observed if sample.queries is not None]
+        endpoints[name] = {
+            "requests": len(observed),
+            "errors": sum(1 for sample in observed if sample.status == 0 or sample.status >= 400),
+            "throughput_rps": len(observed) / span,
+            "latency_ms": _latency_summary(latencies),
+            "db_ms": _latency_summary(sorted(sample.db_ms for sample in timed)) if timed else None,
+            "queries": {
+                "median": statistics.median(sample.queries for sample in timed),
+                "max": max(sample.queries for sample in timed),
+            } if timed else None,
+        }
+    everything.sort()
+    total = {
+        "requests": len(everything),
+        "errors": sum(endpoint["errors"] for endpoint in endpoints.values()),
+        "throughput_rps": len(everything) / span,
+        "latency_ms": _latency_summary(everything),
+    }
+    return {"endpoints": endpoints, "total": total}
+
+def _latency_summary(ordered: List[float]) -> dict:
+    return {
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "mean": statistics.fmean(ordered) if ordered else 0.0,
+        "max": ordered[-1] if ordered else 0.0,
+    }
+
+def git_revision() -> dict:
+    def git(*args) -> str:
+        return subprocess.run(["git", *args], capture_output=True, text=True, cwd=Path(__file__).parent).stdout.strip()
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+async def run(args) -> dict:
+    weights = parse_mix(args.mix)
+    with engine.connect() as connection:
+        dataset = summary(connection)
+    if "trainer" not in dataset["roles"] or "client" not in dataset["roles"]:
+        raise SystemExit("No synthetic users found - run python seed.py --clear --scale 1 first")
+    users = Users(dataset["roles"])
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                   base_url="http://benchmark", timeout=args.timeout)
+
+    try:
+        samples, span = await replay(client, users, weights, args)
+    finally:
+        await client.aclose()
+        if not args.url:
+            from app.core import hashing
+            hashing.shutdown()
+
+    return {
+        "meta": {
+            **git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "target": args.url or "in-process",
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "mix": weights,
+            "dataset": dataset,
+        },
+        **report(samples, span),
+    }
+
+def print_report(result: dict):
+    print(f"{'endpoint':<20} {'requests':>9} {'errors':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'db p50':>8} {'queries':>8}")
+    rows = list(result["endpoints"].items()) + [("total", result["total"])]
+    for name, stats in rows:
+        latency = stats["latency_ms"]
+        db_p50 = f"{stats['db_ms']['p50']:.1f}" if stats.get("db_ms") else "-"
+        queries = stats["queries"]["median"] if stats.get("queries") else "-"
+        print(f"{name:<20} {stats['requests']:>9} {stats['errors']:>7} {stats['throughput_rps']:>8.1f} "
+              f"{latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f} {db_p50:>8} {queries:>8}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server; default calls the app in-process")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds of traffic before measuring")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight,...")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="JSON file; default benchmarks/results/<commit>.json")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{(result['meta']['commit'] or 'local')[:12]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"Wrote {output}")
@@ -0,0 +1,71 @@
+"""
+Per-request cost of the request metrics recorded by RequestTimingMiddleware.
+
+    python -m benchmarks.metrics_overhead [--requests 200000] [--budget 20]
+
+Sends requests through the middleware to a minimal ASGI app, with and without
+the metrics recording, and exits with status 1 when recording adds more than
+--budget microseconds per request. No database or server is needed.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+from app.core import timing
+
+ROUTES = [SimpleNamespace(path=f"/api/route{index}/{{item_id}}") for index in range(20)]
+
+async def endpoint(scope, receive, send):
+    scope["route"] = ROUTES[hash(scope["path"]) % len(ROUTES)]
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+async def send(message):
+    pass
+
+async def per_request(app, requests: int) -> float:
+    """Microseconds per request, best of three runs"""
+    scopes = [{"type": "http", "method": "GET", "path": f"/api/route/{index % 1000}"} for index in range(requests)]
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for scope in scopes:
+            await app(dict(scope), receive, send)
+        best = min(best, time.perf_counter() - started)
+    return best / requests * 1e6
+
+async def run(requests: int) -> dict:
+    middleware = timing.RequestTimingMiddleware(endpoint, header=False)
+    bare = await per_request(endpoint, requests)
+
+    recording = timing.record_request, timing.in_flight
+    timing.record_request = lambda scope, status, seconds: None
+    timing.in_flight = SimpleNamespace(inc=lambda: None, dec=lambda: None)
+    try:
+        without_metrics = await per_request(middleware, requests)
+    finally:
+        timing.record_request, timing.in_flight = recording
+    with_metrics = await per_request(middleware, requests)
+
+    return {
+        "bare_app_us": bare,
+        "middleware_us": without_metrics - bare,
+        "metrics_us": with_metrics - without_metrics,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--budget", type=float, default=20.0, help="allowed microseconds of metrics per request")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.requests))
+    print(f"bare app            {result['bare_app_us']:6.2f} us/request")
+    print(f"timing middleware  +{result['middleware_us']:6.2f} us/request")
+    print(f"metrics recording  +{result['metrics_us']:6.2f} us/request (budget {args.budget:g})")
+    if result["metrics_us"] > args.budget:
+        sys.exit(1)
@@ -0,0 +1,96 @@
+"""
+Response serialization benchmark - stdlib JSON vs orjson vs the trusted_json fast path.
+
+Calls the ASGI apps in-process with 10k workout rows, so only FastAPI's
+validation and encoding are measured (no database, no network):
+
+    python -m benchmarks.serialization [--items 10000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.core.responses import trusted_json
+from app.schemas.schemas import WorkoutResponse
+
+def make_rows(count: int) -> List[dict]:
+    return [
+        {
+            "id": i,
+            "trainer_id": i % 50,
+            "title": f"Workout {i}",
+            "description": "Three rounds: 10 squats, 10 push-ups, 200m row",
+            "trainer_name": f"Trainer {i % 50}"
+        }
+        for i in range(count)
+    ]
+
+def build_apps(rows: List[dict]) -> dict:
+    stdlib = FastAPI(default_response_class=JSONResponse)
+    validated = FastAPI(default_response_class=ORJSONResponse)
+    trusted = FastAPI(default_response_class=ORJSONResponse)
+    
+    @stdlib.get("/workouts", response_model=List[WorkoutResponse])
+    async def stdlib_workouts():
+        return rows
+    
+    @validated.get("/workouts", response_model=List[WorkoutResponse])
+    async def validated_workouts():
+        return rows
+    
+    @trusted.get("/workouts", response_model=List[WorkoutResponse])
+    async def trusted_workouts():
+        return trusted_json(rows)
+    
+    return {
+        "json + response_model": stdlib,
+        "orjson + response_model": validated,
+        "orjson, trusted_json": trusted
+    }
+
+async def call(app, path: str) -> int:
+    """One GET through the ASGI interface; returns the body size"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 0), "server": ("test", 80)
+    }
+    size = 0
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+    
+    await app(scope, receive, send)
+    return size
+
+async def run(items: int, repeat: int):
+    apps = build_apps(make_rows(items))
+    results = {}
+    for name, app in apps.items():
+        await call(app, "/workouts")  # warm up route compilation and caches
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            size = await call(app, "/workouts")
+            timings.append(time.perf_counter() - start)
+        results[name] = (statistics.median(timings), size)
+    
+    baseline = results["json + response_model"][0]
+    print(f"{items} items, median of {repeat} runs")
+    for name, (seconds, size) in results.items():
+        print(f"  {name:<26} {seconds * 1000:8.1f} ms  {size / 1024:8.0f} KiB  x{baseline / seconds:.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.repeat))
@@ -0,0 +1,37 @@
+"""
+Backfill and verify the progress_rollups table.
+
+    python rollups.py rebuild   # recompute every bucket from progress_logs
+    python rollups.py check     # compare stored buckets with a full recompute
+"""
+import sys
+from app.db.database import engine
+from app.db.migrations import upgrade_database
+from app.db.rollups import find_rollup_mismatches, rebuild_rollups
+
+def rebuild():
+    with engine.begin() as connection:
+        count = rebuild_rollups(connection)
+    print(f"Rebuilt {count} rollup rows")
+    return 0
+
+def check():
+    with engine.connect() as connection:
+        mismatches = find_rollup_mismatches(connection)
+    if not mismatches:
+        print("Rollups are consistent with progress_logs")
+        return 0
+    
+    print(f"{len(mismatches)} rollup rows differ from a full recompute:")
+    for mismatch in mismatches[:20]:
+        print(f"  client {mismatch['client_id']} {mismatch['period']} {mismatch['period_start']}")
+    print("Run `python rollups.py rebuild` to repair them")
+    return 1
+
+if __name__ == "__main__":
+    commands = {"rebuild": rebuild, "check": check}
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        print(__doc__)
+        sys.exit(2)
+    upgrade_database()
+    sys.exit(commands[sys.argv[1]]())
@@ -0,0 +1,54 @@
+"""
+Seed the database with the demo accounts and, optionally, a synthetic population.
+
+    python seed.py                   # demo data, only if the database is empty
+    python seed.py --clear           # delete all rows first
+    python seed.py --reset           # drop the schema and re-run every migration first
+    python seed.py --clear --scale 20 --jobs 8   # plus 20k users and ~10M progress logs
+
+Synthetic users log in with the demo passwords: trainer123 and client123.
+"""
+import argparse
+import sys
+import time
+from app.db.migrations import upgrade_database
+from app.db.seeding import Profile, clear_database, drop_schema, is_seeded, seed
+
+def main(args) -> int:
+    if args.reset:
+        print("Dropping the schema...")
+        drop_schema()
+    upgrade_database()
+    if args.clear:
+        print("Clearing existing data...")
+        clear_database()
+    elif is_seeded():
+        print("Database already seeded. Skipping... (use --clear to replace the data)")
+        return 0
+
+    profile = Profile.scaled(
+        args.scale, logs_per_client=args.logs_per_client,
+        assignments_per_client=args.assignments_per_client, seed=args.seed
+    )
+    print(f"Seeding {profile}")
+    start = time.perf_counter()
+    counts = seed(profile, jobs=args.jobs)
+    print(f"Done in {time.perf_counter() - start:.1f}s: " + ", ".join(f"{n:,} {t}" for t, n in counts.items()))
+    print("\nSample accounts:")
+    print("  Trainer: trainer@fitsphere.com / trainer123")
+    print("  Client: client@fitsphere.com / client123")
+    print("  Admin: admin@fitsphere.com / admin123")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=0.0,
+                        help="synthetic population: 1 is 1k users, 10k workouts, ~475k progress logs")
+    parser.add_argument("--logs-per-client", type=int)
+    parser.add_argument("--assignments-per-client", type=int)
+    parser.add_argument("--seed", type=int, default=1, help="random seed; the same seed gives the same rows")
+    parser.add_argument("--jobs", type=int, help="loader processes, default one per CPU")
+    parser.add_argument("--clear", action="store_true", help="delete all rows before seeding")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate the schema before seeding")
+    args = parser.parse_args()
+    sys.exit(main(args))
@@ -0,0 +1,76 @@
+"""
+Shared fixtures. Tests run against the PostgreSQL database in TEST_DATABASE_URL
+(DATABASE_URL when unset), migrated with `alembic upgrade head`. Each test works
+inside one transaction that is rolled back afterwards, so existing rows are left
+alone; tests that need the database are skipped when it can't be reached.
+"""
+import os
+from typing import List
+
+if os.environ.get("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+import httpx
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from app.core.config import settings
+from app.db.database import get_db, get_read_db
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+async def engine():
+    # NullPool: every test gets its own event loop, so connections can't be shared
+    engine = create_async_engine(settings.async_database_url, poolclass=NullPool)
+    yield engine
+    await engine.dispose()
+
+@pytest.fixture
+async def connection(engine):
+    try:
+        connection = await engine.connect()
+    except (OSError, DBAPIError) as exc:
+        pytest.skip(f"test database unavailable: {exc}")
+    transaction = await connection.begin()
+    yield connection
+    await transaction.rollback()
+    await connection.close()
+
+@pytest.fixture
+async def db(connection):
+    """A session whose commits only release savepoints of the test's transaction"""
+    session = AsyncSession(bind=connection, join_transaction_mode="create_savepoint",
+                           autoflush=False, expire_on_commit=False)
+    yield session
+    await session.close()
+
+@pytest.fixture
+def statements(engine) -> List[str]:
+    """Every statement sent through the test engine, in order"""
+    executed: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+@pytest.fixture
+async def client(db):
+    """The API with both session dependencies bound to the test's transaction"""
+    from app.main import app
+
+    async def test_db():
+        yield db
+
+    app.dependency_overrides[get_db] = test_db
+    app.dependency_overrides[get_read_db] = test_db
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
+    app.dependency_overrides.clear()
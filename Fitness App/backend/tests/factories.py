@@ -0,0 +1,34 @@
+"""
+Rows for tests, flushed so they have ids; the test's rollback removes them
+"""
+import uuid
+from datetime import date
+from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Assignment, ProgressLog, User, Workout
+
+async def make_user(db: AsyncSession, role: str) -> User:
+    user = User(name=f"Test {role}", email=f"{role}-{uuid.uuid4().hex}@test.fitsphere.com",
+                password_hash="not-a-hash", role=role)
+    db.add(user)
+    await db.flush()
+    return user
+
+async def make_workouts(db: AsyncSession, trainer: User, count: int) -> List[Workout]:
+    workouts = [Workout(trainer_id=trainer.id, title=f"Workout {index}", description="Squats and lunges")
+                for index in range(count)]
+    db.add_all(workouts)
+    await db.flush()
+    return workouts
+
+async def assign(db: AsyncSession, client: User, workouts: List[Workout]) -> List[Assignment]:
+    assignments = [Assignment(client_id=client.id, workout_id=workout.id) for workout in workouts]
+    db.add_all(assignments)
+    await db.flush()
+    return assignments
+
+async def make_logs(db: AsyncSession, client: User, days: List[date]) -> List[ProgressLog]:
+    logs = [ProgressLog(client_id=client.id, date=day, weight=80.0, calories=2000) for day in days]
+    db.add_all(logs)
+    await db.flush()
+    return logs
@@ -0,0 +1,73 @@
+"""
+Batch assignment: set-based validation, ownership of the workouts and idempotent re-assignment
+"""
+import pytest
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.models.models import Assignment
+from tests.factories import assign, make_user, make_workouts
+
+pytestmark = pytest.mark.anyio
+
+async def batch(client, trainer_id, client_ids, workout_ids):
+    return await client.post("/api/assignments/batch", params={"trainer_id": trainer_id},
+                             json={"client_ids": client_ids, "workout_ids": workout_ids})
+
+async def test_batch_assigns_every_pair(client, db):
+    trainer = await make_user(db, "trainer")
+    members = [await make_user(db, "client") for _ in range(3)]
+    workouts = await make_workouts(db, trainer, 2)
+
+    response = await batch(client, trainer.id, [member.id for member in members], [workout.id for workout in workouts])
+    assert response.status_code == 200
+    created = response.json()["created"]
+    assert {(row["client_id"], row["workout_id"]) for row in created} == {
+        (member.id, workout.id) for member in members for workout in workouts
+    }
+    assert {row["workout_title"] for row in created} == {"Workout 0", "Workout 1"}
+    assert response.json()["skipped"] == []
+
+async def test_batch_skips_existing_assignments(client, db):
+    trainer, first, second = await make_user(db, "trainer"), await make_user(db, "client"), await make_user(db, "client")
+    workouts = await make_workouts(db, trainer, 1)
+    await assign(db, first, workouts)
+
+    response = await batch(client, trainer.id, [first.id, second.id, second.id], [workouts[0].id])
+    body = response.json()
+    assert [row["client_id"] for row in body["created"]] == [second.id]
+    assert body["skipped"] == [{"client_id": first.id, "workout_id": workouts[0].id}]
+
+    again = (await batch(client, trainer.id, [first.id, second.id], [workouts[0].id])).json()
+    assert again["created"] == [] and len(again["skipped"]) == 2
+    count = await db.scalar(select(func.count()).where(Assignment.workout_id == workouts[0].id))
+    assert count == 2
+
+async def test_batch_rejects_unknown_clients_and_workouts(client, db):
+    trainer, member = await make_user(db, "trainer"), await make_user(db, "client")
+    workouts = await make_workouts(db, trainer, 1)
+
+    response = await batch(client, trainer.id, [member.id, trainer.id, 2**31 - 1], [workouts[0].id, 2**31 - 1])
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert detail["invalid_client_ids"] == [trainer.id, 2**31 - 1]  # a trainer is not a client
+    assert detail["invalid_workout_ids"] == [2**31 - 1]
+    assert await db.scalar(select(func.count()).where(Assignment.client_id == member.id)) == 0
+
+async def test_batch_only_assigns_the_trainers_own_workouts(client, db):
+    trainer, other, member = await make_user(db, "trainer"), await make_user(db, "trainer"), await make_user(db, "client")
+    own, foreign = await make_workouts(db, trainer, 1), await make_workouts(db, other, 1)
+
+    response = await batch(client, trainer.id, [member.id], [own[0].id, foreign[0].id])
+    assert response.status_code == 403
+    assert response.json()["detail"]["workout_ids"] == [foreign[0].id]
+    assert await db.scalar(select(func.count()).where(Assignment.client_id == member.id)) == 0
+
+    assert (await batch(client, member.id, [member.id], [own[0].id])).status_code == 403
+    admin = await make_user(db, "admin")
+    assert (await batch(client, admin.id, [member.id], [own[0].id, foreign[0].id])).status_code == 200
+
+async def test_batch_size_limit(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_MAX_ITEMS", 3)
+    trainer = await make_user(db, "trainer")
+    response = await batch(client, trainer.id, [1, 2], [1, 2])
+    assert response.status_code == 413
@@ -0,0 +1,60 @@
+"""
+Changed users leave the auth cache only once the change is committed, and a
+row loaded before that can't be cached again afterwards
+"""
+import pytest
+from app.core import security
+from app.core.cache import TTLCache
+from app.core.security import cache_user, invalidate_user, invalidation_count, user_cache
+from tests.factories import make_user
+
+pytestmark = pytest.mark.anyio
+
+async def test_role_change_invalidates_on_commit_not_flush(db):
+    user = await make_user(db, "client")
+    cache_user(user)
+    user.role = "trainer"
+    await db.flush()
+    assert user_cache.get(user.id).role == "client"  # not committed: others still see the old role
+    await db.commit()
+    assert user_cache.get(user.id) is None
+
+async def test_rolled_back_change_keeps_the_cache(db):
+    user = await make_user(db, "client")
+    await db.commit()
+    user_id = cache_user(user).id
+    user.role = "trainer"
+    await db.flush()
+    await db.rollback()
+    assert user_cache.get(user_id).role == "client"
+
+async def test_deleted_user_is_invalidated(db):
+    user = await make_user(db, "client")
+    cache_user(user)
+    await db.delete(user)
+    await db.commit()
+    assert user_cache.get(user.id) is None
+
+async def test_row_loaded_before_invalidation_is_not_cached(db):
+    user = await make_user(db, "client")
+    loaded_after = invalidation_count()  # a request starts loading the user ...
+    user.role = "trainer"
+    await db.commit()  # ... while another commits a change
+    cached = cache_user(user, loaded_after)
+    assert cached.role == "trainer"
+    assert user_cache.get(user.id) is None
+    cache_user(user, invalidation_count())
+    assert user_cache.get(user.id).role == "trainer"
+
+async def test_other_users_invalidations_dont_block_caching(db):
+    user = await make_user(db, "client")
+    loaded_after = invalidation_count()
+    invalidate_user(user.id + 1)
+    cache_user(user, loaded_after)
+    assert user_cache.get(user.id) is not None
+
+def test_invalidation_markers_are_bounded(monkeypatch):
+    monkeypatch.setattr(security, "_invalidated_at", TTLCache("test_invalidations", maxsize=10, ttl=60))
+    for user_id in range(1000):
+        invalidate_user(user_id)
+    assert len(security._invalidated_at._data) == 10
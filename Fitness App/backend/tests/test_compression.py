@@ -0,0 +1,127 @@
+"""
+CompressionMiddleware: Accept-Encoding negotiation, what gets compressed, and
+streams passing through chunk by chunk
+"""
+import gzip
+import json
+import os
+import zlib
+import pytest
+from starlette.datastructures import Headers
+from app.core import compression
+from app.core.compression import CompressionMiddleware, choose_encoding
+
+pytestmark = pytest.mark.anyio
+
+BODY = json.dumps([{"id": index, "title": "Squats and lunges"} for index in range(200)]).encode()
+needs_brotli = pytest.mark.skipif(compression.brotli is None, reason="brotli is not installed")
+needs_zstd = pytest.mark.skipif(compression.zstandard is None, reason="zstandard is not installed")
+
+def responder(chunks, content_type="application/json", headers=()):
+    """An app sending chunks as one body message each; a single chunk is the whole body"""
+    async def app(scope, receive, send):
+        raw = [(b"content-type", content_type.encode()), *((k.encode(), v.encode()) for k, v in headers)]
+        if len(chunks) == 1:
+            raw.append((b"content-length", str(len(chunks[0])).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": raw})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+    return app
+
+async def run(app, accept_encoding="gzip", method="GET", thread_size=64 * 1024, sent=None):
+    sent = [] if sent is None else sent
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    scope = {"type": "http", "method": method, "path": "/", "headers": headers}
+    await CompressionMiddleware(app, minimum_size=100, thread_size=thread_size)(scope, receive, send)
+    start, *bodies = sent
+    return Headers(raw=start["headers"]), [message["body"] for message in bodies]
+
+@pytest.mark.parametrize("accept_encoding,expected", [
+    ("gzip", "gzip"),
+    ("GZip", "gzip"),
+    ("gzip;q=0", None),
+    ("gzip;q=oops", None),
+    ("identity", None),
+    ("deflate, compress", None),
+    ("", None),
+    pytest.param("gzip;q=0.5, br;q=0.8", "br", marks=needs_brotli),
+    pytest.param("br;q=0, gzip", "gzip", marks=needs_brotli),
+    pytest.param("gzip, br", "br", marks=needs_brotli),  # ties go to COMPRESSION_ENCODINGS order
+    pytest.param("*", "zstd", marks=needs_zstd),
+    pytest.param("*, zstd;q=0", "br", marks=[needs_zstd, needs_brotli]),
+])
+def test_negotiation(accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
+async def test_large_body_is_compressed():
+    headers, bodies = await run(responder([BODY], headers=[("vary", "Origin"), ("etag", '"abc"')]))
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Origin, Accept-Encoding"
+    assert headers["etag"] == 'W/"abc"'
+    assert int(headers["content-length"]) == len(bodies[0]) < len(BODY)
+    assert gzip.decompress(bodies[0]) == BODY
+
+@needs_brotli
+async def test_brotli_body():
+    headers, bodies = await run(responder([BODY]), accept_encoding="br")
+    assert headers["content-encoding"] == "br"
+    assert compression.brotli.decompress(bodies[0]) == BODY
+
+@needs_zstd
+async def test_zstd_body_compressed_off_the_event_loop():
+    headers, bodies = await run(responder([BODY]), accept_encoding="zstd", thread_size=10)
+    assert headers["content-encoding"] == "zstd"
+    assert compression.zstandard.ZstdDecompressor().decompressobj().decompress(bodies[0]) == BODY
+
+@pytest.mark.parametrize("app", [
+    responder([b'{"ok": true}']),                                    # under minimum_size
+    responder([BODY], content_type="image/png"),                     # already compressed media
+    responder([BODY], headers=[("content-encoding", "br")]),         # encoded by the app
+    responder([os.urandom(4096)], content_type="text/plain"),        # would only grow
+])
+async def test_left_alone(app):
+    headers, bodies = await run(app)
+    assert "content-encoding" not in headers or headers["content-encoding"] == "br"
+    assert "accept-encoding" not in headers.get("vary", "").lower()
+    assert bodies[0] == b"".join(bodies)
+
+@pytest.mark.parametrize("accept_encoding,method", [("", "GET"), ("gzip", "HEAD")])
+async def test_passthrough_without_negotiation(accept_encoding, method):
+    headers, bodies = await run(responder([BODY]), accept_encoding=accept_encoding, method=method)
+    assert "content-encoding" not in headers
+    assert bodies == [BODY]
+
+async def test_event_stream_is_forwarded_message_by_message():
+    sent = []
+    events = [f"data: {json.dumps({'type': 'ping', 'padding': 'x' * 500})}\n\n".encode() for _ in range(3)]
+
+    async def stream(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/event-stream; charset=utf-8")]})
+        for index, event in enumerate(events):
+            await send({"type": "http.response.body", "body": event, "more_body": True})
+            assert sent[-1]["body"] == event, f"event {index} was held back"
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    headers, bodies = await run(stream, sent=sent)
+    assert "content-encoding" not in headers
+    assert bodies == events + [b""]
+
+async def test_streamed_json_is_flushed_per_chunk():
+    chunks = [BODY[start:start + 1000] for start in range(0, len(BODY), 1000)]
+    headers, bodies = await run(responder(chunks))
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert len(bodies) == len(chunks)
+    # Every compressed chunk decodes to its whole input right away
+    decoder = zlib.decompressobj(31)
+    for chunk, compressed in zip(chunks, bodies):
+        assert decoder.decompress(compressed) == chunk
+    assert decoder.eof
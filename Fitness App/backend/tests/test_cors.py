@@ -0,0 +1,31 @@
+"""
+Credentialed browser requests need the origin echoed back, never "*"
+"""
+import httpx
+import pytest
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def plain_client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
+
+async def test_allowed_origin_is_echoed_without_a_cookie(plain_client):
+    response = await plain_client.get("/", headers={"Origin": "http://localhost:5173"})
+    assert response.headers["access-control-allow-origin"] == "http://localhost:5173"
+    assert response.headers["access-control-allow-credentials"] == "true"
+
+async def test_preflight_for_login(plain_client):
+    response = await plain_client.options("/api/auth/login", headers={
+        "Origin": "http://localhost:5173",
+        "Access-Control-Request-Method": "POST",
+        "Access-Control-Request-Headers": "content-type",
+    })
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "http://localhost:5173"
+
+async def test_unknown_origin_gets_no_cors_headers(plain_client):
+    response = await plain_client.get("/", headers={"Origin": "https://evil.example"})
+    assert "access-control-allow-origin" not in response.headers
@@ -0,0 +1,67 @@
+"""
+Dashboards cap every section and share a per-worker limit on sections in flight
+"""
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.database import get_read_sessionmaker
+from app.main import app
+from app.routes import dashboard
+from tests.factories import assign, make_user, make_workouts
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def sessions(client, connection, monkeypatch):
+    """Dashboard sessions on the test transaction, counting how many are open at once"""
+    counts = {"open": 0, "peak": 0}
+
+    class CountingSession(AsyncSession):
+        async def __aenter__(self):
+            counts["open"] += 1
+            counts["peak"] = max(counts["peak"], counts["open"])
+            await asyncio.sleep(0)  # let the other sections start too
+            return await super().__aenter__()
+
+        async def __aexit__(self, *exc_info):
+            counts["open"] -= 1
+            return await super().__aexit__(*exc_info)
+
+    app.dependency_overrides[get_read_sessionmaker] = lambda: lambda: CountingSession(
+        bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False
+    )
+    # One connection underneath, so the sections must also take turns on it
+    monkeypatch.setattr(dashboard, "_sections", asyncio.Semaphore(1))
+    return counts
+
+async def test_trainer_dashboard_caps_sections(client, db, sessions, monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_ROW_LIMIT", 3)
+    monkeypatch.setattr(settings, "DASHBOARD_LOG_LIMIT", 2)
+    trainer = await make_user(db, "trainer")
+    workouts = await make_workouts(db, trainer, 5)
+    for _ in range(5):
+        await assign(db, await make_user(db, "client"), workouts[:1])
+    await db.commit()
+
+    response = await client.get(f"/api/dashboard/trainer/{trainer.id}")
+    assert response.status_code == 200
+    body = response.json()
+    assert [row["id"] for row in body["workouts"]] == [workout.id for workout in workouts[-3:]]
+    assert len(body["clients"]) == 3
+    assert body["clients"] == sorted(body["clients"], key=lambda row: row["id"])
+    assert len(body["assignments"]) == 3
+    assert len(body["progress_logs"]) <= 2
+    assert sessions["peak"] == 1
+
+async def test_client_dashboard_caps_sections(client, db, sessions, monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_ROW_LIMIT", 2)
+    trainer, member = await make_user(db, "trainer"), await make_user(db, "client")
+    workouts = await make_workouts(db, trainer, 4)
+    await assign(db, member, workouts)
+    await db.commit()
+
+    response = await client.get(f"/api/dashboard/client/{member.id}")
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()["workouts"]] == [workout.id for workout in workouts[-2:]]
+    assert sessions["peak"] == 1
@@ -0,0 +1,52 @@
+"""
+Event stream subscriptions exist only while the response body is being sent
+"""
+import pytest
+from fastapi import HTTPException
+from app.core import events
+from app.core.events import InProcessEventBus, client_channel
+from app.core.security import CurrentUser, user_cache
+from app.routes.events import stream_events
+
+pytestmark = pytest.mark.anyio
+
+USER = CurrentUser(id=2_000_000_000, name="Stream client", email="stream@test.fitsphere.com", role="client")
+
+@pytest.fixture
+def bus():
+    previous = events.get_bus()
+    bus = InProcessEventBus(max_subscribers=1)
+    events.set_bus(bus)
+    user_cache.set(USER.id, USER)
+    yield bus
+    user_cache.pop(USER.id)
+    events.set_bus(previous)
+
+async def test_no_subscription_until_the_body_starts(bus):
+    response = await stream_events(USER.id)
+    # The client went away before the body was sent: nothing to leak
+    assert bus.has_capacity()
+    await response.body_iterator.aclose()
+    assert bus.has_capacity()
+
+async def test_subscription_ends_with_the_body(bus):
+    response = await stream_events(USER.id)
+    body = response.body_iterator
+    assert await body.__anext__() == "retry: 5000\n\n"
+    assert not bus.has_capacity()
+    await bus.publish(client_channel(USER.id), events.Event("workout.created", {"id": 1}))
+    assert '"workout.created"' in await body.__anext__()
+    await body.aclose()
+    assert bus.has_capacity()
+
+async def test_full_bus_answers_503(bus):
+    bus.subscribe("someone-else")
+    with pytest.raises(HTTPException) as raised:
+        await stream_events(USER.id)
+    assert raised.value.status_code == 503
+
+async def test_bus_filling_up_after_the_check_ends_the_stream(bus):
+    response = await stream_events(USER.id)
+    bus.subscribe("someone-else")
+    assert [chunk async for chunk in response.body_iterator] == ["retry: 30000\n\n"]
+    assert not bus._channels.get(client_channel(USER.id))
@@ -0,0 +1,59 @@
+"""
+Password hashing backpressure and cost upgrades on login
+"""
+import uuid
+import bcrypt
+import pytest
+from app.core import hashing
+from app.core.config import settings
+from tests.factories import make_user
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(scope="module", autouse=True)
+def process_pool():
+    yield
+    hashing.shutdown()
+
+@pytest.fixture
+def busy(monkeypatch):
+    """Every hashing slot taken by requests still in flight"""
+    monkeypatch.setattr(hashing, "_pending", settings.BCRYPT_MAX_PENDING)
+
+async def test_register_is_refused_while_the_pool_is_busy(client, busy):
+    response = await client.post("/api/auth/register", json={
+        "name": "Busy", "email": f"busy-{uuid.uuid4().hex}@test.fitsphere.com", "password": "secret123",
+    })
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+async def test_login_is_refused_while_the_pool_is_busy(client, db, busy):
+    user = await make_user(db, "client")
+    response = await client.post("/api/auth/login", json={"email": user.email, "password": "secret123"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+async def test_pending_count_is_released(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    hashed = await hashing.hash_password("secret123")
+    assert await hashing.verify_password("secret123", hashed)
+    assert not await hashing.verify_password("wrong", hashed)
+    assert hashing._pending == 0
+
+def test_needs_rehash(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    assert hashing.needs_rehash(bcrypt.hashpw(b"secret123", bcrypt.gensalt(rounds=4)).decode())
+    assert not hashing.needs_rehash(bcrypt.hashpw(b"secret123", bcrypt.gensalt(rounds=5)).decode())
+    assert hashing.needs_rehash("not-a-hash")
+
+async def test_login_upgrades_an_old_cost_hash(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    user = await make_user(db, "client")
+    user.password_hash = bcrypt.hashpw(b"secret123", bcrypt.gensalt(rounds=4)).decode()
+    await db.commit()
+
+    response = await client.post("/api/auth/login", json={"email": user.email, "password": "secret123"})
+    assert response.status_code == 200
+    await db.refresh(user)
+    assert user.password_hash.startswith("$2b$05$")
+    assert bcrypt.checkpw(b"secret123", user.password_hash.encode())
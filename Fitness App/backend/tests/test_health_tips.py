@@ -0,0 +1,31 @@
+"""
+The health tips cache is filled from the primary, so a lagging replica can't
+put tips from before an invalidation back into it
+"""
+import pytest
+from app.db.database import get_read_db
+from app.main import app
+from app.models.models import HealthTip
+from app.routes.health_tips import invalidate_health_tips
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def no_replica(client):
+    async def replica():
+        raise AssertionError("health tips were read from a replica")
+        yield
+
+    app.dependency_overrides[get_read_db] = replica
+
+async def test_new_tip_is_listed_after_invalidation(client, db, no_replica):
+    before = (await client.get("/api/health-tips", params={"limit": 1000})).json()["items"]
+    tip = HealthTip(title="Hydrate", content="Drink water before training")
+    db.add(tip)
+    await db.commit()
+    invalidate_health_tips()
+
+    items = (await client.get("/api/health-tips", params={"limit": 1000})).json()["items"]
+    assert tip.id in [item["id"] for item in items]
+    assert len(items) == len(before) + 1
+    assert (await client.get(f"/api/health-tips/{tip.id}")).json()["title"] == "Hydrate"
@@ -0,0 +1,42 @@
+"""
+Listings fetch related names with JOINs, so their statement count must not grow with the rows
+"""
+import pytest
+from tests.factories import assign, make_user, make_workouts
+
+pytestmark = pytest.mark.anyio
+
+async def count_statements(client, db, statements, path: str, expected_items: int) -> int:
+    db.expunge_all()  # make the route load users itself rather than hit the identity map
+    statements.clear()
+    response = await client.get(path)
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == expected_items
+    assert statements, "no statements were recorded"
+    return len(statements)
+
+async def test_trainer_workout_listing_is_constant(client, db, statements):
+    trainer = await make_user(db, "trainer")
+    await make_workouts(db, trainer, 5)
+    few = await count_statements(client, db, statements, f"/api/workouts?user_id={trainer.id}&limit=100", 5)
+    await make_workouts(db, trainer, 45)
+    many = await count_statements(client, db, statements, f"/api/workouts?user_id={trainer.id}&limit=100", 50)
+    assert few == many
+
+async def test_client_workout_listing_is_constant(client, db, statements):
+    trainer, member = await make_user(db, "trainer"), await make_user(db, "client")
+    await assign(db, member, await make_workouts(db, trainer, 5))
+    few = await count_statements(client, db, statements, f"/api/workouts?user_id={member.id}&limit=100", 5)
+    await assign(db, member, await make_workouts(db, trainer, 45))
+    many = await count_statements(client, db, statements, f"/api/workouts?user_id={member.id}&limit=100", 50)
+    assert few == many
+
+@pytest.mark.parametrize("viewer", ["trainer", "client"])
+async def test_assignment_listing_is_constant(client, db, statements, viewer):
+    trainer, member = await make_user(db, "trainer"), await make_user(db, "client")
+    user_id = trainer.id if viewer == "trainer" else member.id
+    await assign(db, member, await make_workouts(db, trainer, 5))
+    few = await count_statements(client, db, statements, f"/api/assignments?user_id={user_id}&limit=100", 5)
+    await assign(db, member, await make_workouts(db, trainer, 45))
+    many = await count_statements(client, db, statements, f"/api/assignments?user_id={user_id}&limit=100", 50)
+    assert few == many
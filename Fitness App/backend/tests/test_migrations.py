@@ -0,0 +1,45 @@
+"""
+Migrations that touch existing rows, run inside the test's transaction
+"""
+import importlib.util
+from datetime import date
+from pathlib import Path
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from alembic.util import CommandError
+from sqlalchemy import func, select, text
+from app.models.models import ProgressLog
+from tests.factories import make_logs, make_user
+
+pytestmark = pytest.mark.anyio
+
+VERSIONS = Path(__file__).resolve().parent.parent / "alembic" / "versions"
+
+def load_migration(name: str):
+    spec = importlib.util.spec_from_file_location(name, VERSIONS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def run(connection, step):
+    with Operations.context(MigrationContext.configure(connection)):
+        step()
+
+async def test_unique_log_date_refuses_to_drop_duplicates(connection, db):
+    migration = load_migration("0004_unique_progress_log_date")
+    await connection.run_sync(run, migration.downgrade)
+    member = await make_user(db, "client")
+    await make_logs(db, member, [date(2024, 1, 1), date(2024, 1, 1), date(2024, 1, 2)])
+
+    with pytest.raises(CommandError, match=f"client {member.id} on 2024-01-01: 2 logs"):
+        await connection.run_sync(run, migration.upgrade)
+    count = await db.scalar(select(func.count()).where(ProgressLog.client_id == member.id))
+    assert count == 3
+
+async def test_unique_log_date_applies_without_duplicates(connection, db):
+    migration = load_migration("0004_unique_progress_log_date")
+    await connection.run_sync(run, migration.downgrade)
+    await connection.run_sync(run, migration.upgrade)
+    constraint = await connection.scalar(text("SELECT 1 FROM pg_constraint WHERE conname = 'unique_client_date'"))
+    assert constraint == 1
@@ -0,0 +1,45 @@
+from datetime import date
+import pytest
+from fastapi import HTTPException
+from app.core.pagination import decode_cursor, encode_cursor, iso_date, revision, row_id
+
+def test_round_trip():
+    cursor = encode_cursor([date(2024, 5, 1).isoformat(), 42])
+    assert decode_cursor(cursor, iso_date, row_id) == [date(2024, 5, 1), 42]
+    assert decode_cursor(encode_cursor([2 ** 40]), revision) == [2 ** 40]
+
+@pytest.mark.parametrize("values, converters", [
+    ([True], (row_id,)),
+    ([1.0], (row_id,)),
+    ([1e300], (row_id,)),
+    (["7"], (row_id,)),
+    ([2 ** 31], (row_id,)),
+    ([-2 ** 31 - 1], (row_id,)),
+    ([2 ** 63], (revision,)),
+    ([None], (row_id,)),
+    ([20240501, 1], (iso_date, row_id)),
+    (["2024-13-01", 1], (iso_date, row_id)),
+    ([1, 2], (row_id,)),
+    ({"id": 1}, (row_id,)),
+])
+def test_rejects_values_postgres_would_choke_on(values, converters):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(encode_cursor(values), *converters)
+    assert raised.value.status_code == 400
+
+@pytest.mark.parametrize("cursor", ["%%%", "bm90IGpzb24", ""])
+def test_rejects_garbage(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor, row_id)
+    assert raised.value.status_code == 400
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("path, values", [
+    ("/api/workouts", [1e300]),
+    ("/api/assignments", [2 ** 31]),
+    ("/api/progress", ["2024-05-01", True]),
+    ("/api/users", [True]),
+])
+async def test_listings_answer_bad_cursors_with_400(client, path, values):
+    response = await client.get(path, params={"cursor": encode_cursor(values)})
+    assert response.status_code == 400
@@ -0,0 +1,115 @@
+"""
+Progress log writes: one log per client and day, created or updated in place
+"""
+from datetime import date
+import pytest
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.models.models import ProgressLog, ProgressRollup
+from app.routes import progress
+from tests.factories import make_user
+
+pytestmark = pytest.mark.anyio
+
+async def test_second_log_for_a_day_replaces_the_first(client, db):
+    member = await make_user(db, "client")
+    log = {"client_id": member.id, "date": "2024-03-01", "weight": 80.0, "calories": 2000}
+    first = await client.post("/api/progress", json=log)
+    assert first.status_code == 201
+
+    second = await client.post("/api/progress", json={**log, "weight": 79.5, "notes": "evening"})
+    assert second.status_code == 200
+    assert second.json() == {**first.json(), "weight": 79.5, "notes": "evening"}
+    count = await db.scalar(select(func.count()).where(ProgressLog.client_id == member.id))
+    assert count == 1
+
+async def logs_of(db, member):
+    return list(await db.scalars(
+        select(ProgressLog).where(ProgressLog.client_id == member.id).order_by(ProgressLog.date)
+    ))
+
+async def test_bulk_reports_created_and_updated(client, db):
+    member = await make_user(db, "client")
+    existing = (await client.post("/api/progress", json={
+        "client_id": member.id, "date": "2024-03-01", "weight": 80.0,
+    })).json()
+
+    response = await client.post("/api/progress/bulk", json=[
+        {"client_id": member.id, "date": "2024-03-01", "weight": 79.0, "calories": 1900},
+        {"client_id": member.id, "date": "2024-03-02", "weight": 78.5},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["updated"], body["failed"]) == (1, 1, 0)
+    assert body["results"][0] == {"index": 0, "status": "updated", "id": existing["id"], "detail": None}
+    assert body["results"][1]["status"] == "created"
+    assert [(log.weight, log.calories) for log in await logs_of(db, member)] == [(79.0, 1900), (78.5, None)]
+
+async def test_bulk_later_item_for_the_same_day_wins(client, db):
+    member = await make_user(db, "client")
+    response = await client.post("/api/progress/bulk", json=[
+        {"client_id": member.id, "date": "2024-03-01", "weight": 80.0},
+        {"client_id": member.id, "date": "2024-03-01", "weight": 81.0},
+    ])
+    results = response.json()["results"]
+    assert results[0] == {"index": 0, "status": "superseded", "id": None, "detail": "Replaced by item 1"}
+    assert results[1]["status"] == "created"
+    assert [log.weight for log in await logs_of(db, member)] == [81.0]
+
+async def test_bulk_reports_item_errors_and_writes_the_rest(client, db):
+    member, trainer = await make_user(db, "client"), await make_user(db, "trainer")
+    response = await client.post("/api/progress/bulk", json=[
+        {"client_id": member.id, "date": "not-a-date"},
+        {"client_id": trainer.id, "date": "2024-03-01"},
+        {"client_id": member.id, "date": "2024-03-01", "calories": 2100},
+    ])
+    body = response.json()
+    assert (body["created"], body["failed"]) == (1, 2)
+    assert body["results"][0]["status"] == "error"
+    assert body["results"][0]["detail"][0]["loc"] == ["date"]
+    assert body["results"][1] == {"index": 1, "status": "error", "id": None, "detail": "Client not found"}
+    assert body["results"][2]["status"] == "created"
+
+async def test_bulk_accepts_ndjson(client, db):
+    member = await make_user(db, "client")
+    lines = [
+        f'{{"client_id": {member.id}, "date": "2024-03-01", "weight": 80.0}}',
+        "",
+        f'{{"client_id": {member.id}, "date": "2024-03-02", "weight": 79.5}}',
+        "{broken",
+    ]
+    response = await client.post("/api/progress/bulk", content="\n".join(lines) + "\n",
+                                 headers={"Content-Type": "application/x-ndjson"})
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [result["status"] for result in body["results"]] == ["created", "created", "error"]
+
+@pytest.mark.parametrize("body", ['{"client_id": 1}', "not json"])
+async def test_bulk_rejects_a_body_that_is_not_a_list(client, body):
+    response = await client.post("/api/progress/bulk", content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 400
+
+async def test_bulk_item_limit(client, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_MAX_ITEMS", 2)
+    response = await client.post("/api/progress/bulk", json=[{}] * 3)
+    assert response.status_code == 413
+
+async def test_bulk_refreshes_rollups_in_the_same_transaction(client, db, monkeypatch):
+    member = await make_user(db, "client")
+    await db.commit()
+    item = {"client_id": member.id, "date": "2024-03-05", "weight": 80.0, "calories": 2000}
+
+    response = await client.post("/api/progress/bulk", json=[item])
+    assert response.json()["created"] == 1
+    rollup = await db.get(ProgressRollup, (member.id, "day", date(2024, 3, 5)))
+    assert (rollup.log_count, rollup.weight_sum, rollup.calorie_sum) == (1, 80.0, 2000)
+
+    async def failing_refresh(db, days_by_client):
+        raise RuntimeError("rollup refresh failed")
+
+    monkeypatch.setattr(progress, "refresh_rollups", failing_refresh)
+    with pytest.raises(RuntimeError):
+        await client.post("/api/progress/bulk", json=[{**item, "date": "2024-03-06"}])
+    await db.rollback()  # as get_db's session would on the way out
+    logged = await db.scalars(select(ProgressLog.date).where(ProgressLog.client_id == item["client_id"]))
+    assert list(logged) == [date(2024, 3, 5)]
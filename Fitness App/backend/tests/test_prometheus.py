@@ -0,0 +1,98 @@
+"""
+/metrics in the Prometheus text format: route templates as labels, and totals
+summed over the workers' multiprocess files
+"""
+import json
+import os
+import re
+import time
+import pytest
+from app.core import metrics, prometheus
+from app.core.config import settings
+from tests.factories import make_user
+
+pytestmark = pytest.mark.anyio
+
+TYPE_LINE = re.compile(r"^# TYPE [a-zA-Z_:][a-zA-Z0-9_:]* (counter|gauge|histogram)$")
+SAMPLE_LINE = re.compile(
+    r'^[a-zA-Z_:][a-zA-Z0-9_:]*'
+    r'(\{[a-zA-Z_][a-zA-Z0-9_]*="(\\.|[^"\\])*"(,[a-zA-Z_][a-zA-Z0-9_]*="(\\.|[^"\\])*")*\})?'
+    r' -?(\d+(\.\d+)?(e-?\d+)?|\+Inf|NaN)$'
+)
+
+def samples(text: str) -> dict:
+    """Sample line -> value, after checking every line against the exposition format"""
+    values = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            assert TYPE_LINE.match(line), line
+        else:
+            assert SAMPLE_LINE.match(line), line
+            series, _, value = line.rpartition(" ")
+            values[series] = float(value)
+    return values
+
+def test_render_format():
+    metrics.counter("test.widgets", kind='quoted "name"').inc(3)
+    metrics.gauge("test.level").set(2.5)
+    latency = metrics.latency("test.wait")
+    for seconds in (0.002, 0.002, 0.3):
+        latency.observe(seconds)
+
+    text = prometheus.render()
+    values = samples(text)
+    assert "# TYPE fitsphere_test_widgets_total counter" in text
+    assert values['fitsphere_test_widgets_total{kind="quoted \\"name\\""}'] == 3
+    assert values["fitsphere_test_level"] == 2.5
+    assert "# TYPE fitsphere_test_wait_seconds histogram" in text
+    assert values['fitsphere_test_wait_seconds_bucket{le="0.001"}'] == 0
+    assert values['fitsphere_test_wait_seconds_bucket{le="0.005"}'] == 2
+    assert values['fitsphere_test_wait_seconds_bucket{le="0.5"}'] == 3
+    assert values['fitsphere_test_wait_seconds_bucket{le="+Inf"}'] == 3
+    assert values["fitsphere_test_wait_seconds_count"] == 3
+    assert values["fitsphere_test_wait_seconds_sum"] == pytest.approx(0.304)
+
+async def test_requests_are_labelled_by_route_template(client, db):
+    member = await make_user(db, "client")
+    for log_id in (2**31 - 2, 2**31 - 1):
+        assert (await client.get(f"/api/progress/{log_id}")).status_code == 404
+    await client.get(f"/api/no-such-route/{member.id}")
+
+    response = await client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    values = samples(response.text)
+    template = 'fitsphere_http_requests_total{method="GET",route="/api/progress/{log_id}",status="404"}'
+    assert values[template] >= 2
+    assert 'route="unmatched"' in response.text
+    assert f"{2**31 - 1}" not in response.text
+    assert f"/api/no-such-route/{member.id}" not in response.text
+
+def write_dump(directory, pid: int, counter: float, gauge: float, bucket_hits: int, age: float = 0.0):
+    buckets = [0] * (len(metrics.LATENCY_BUCKETS) + 1)
+    buckets[0] = bucket_hits
+    path = os.path.join(directory, f"{pid}.json")
+    with open(path, "w") as file:
+        json.dump({
+            "pid": pid,
+            "counters": [["test.jobs", [["queue", "mail"]], counter]],
+            "gauges": [["test.workers_busy", [], gauge]],
+            "histograms": [["test.job", [], bucket_hits, bucket_hits * 0.001, buckets]],
+        }, file)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+
+def test_multiprocess_files_are_summed(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "METRICS_FLUSH_SECONDS", 1.0)
+    write_dump(tmp_path, 1_000_001, counter=5, gauge=2, bucket_hits=1)
+    write_dump(tmp_path, 1_000_002, counter=7, gauge=3, bucket_hits=2, age=60)  # exited worker
+    (tmp_path / "1000003.json.99.tmp").write_text("{half written")
+
+    values = samples(prometheus.render())
+    # Counters and histograms of exited workers still count; their gauges don't
+    assert values['fitsphere_test_jobs_total{queue="mail"}'] == 12
+    assert values["fitsphere_test_workers_busy"] == 2
+    assert values["fitsphere_test_job_seconds_count"] == 3
+    assert values['fitsphere_test_job_seconds_bucket{le="0.001"}'] == 3
+    # This worker flushed its own file to take part
+    assert (tmp_path / f"{os.getpid()}.json").exists()
@@ -0,0 +1,99 @@
+"""
+The listing and keyset queries the routes actually run must be able to use the
+indexes added for them (migration 0002). Sequential scans are disabled for the
+EXPLAIN, so the result doesn't depend on how much data the test database holds.
+"""
+import json
+from typing import Iterator, List, Set, Tuple
+import pytest
+from sqlalchemy import event, select
+from app.core.pagination import encode_cursor
+from app.models.models import User
+from app.routes.users import _user_page
+from tests.factories import assign, make_user, make_workouts
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def executed(engine) -> List[Tuple[str, tuple]]:
+    captured: List[Tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield captured
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+def nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from nodes(child)
+
+def index_names(plan: dict) -> Set[str]:
+    return {node["Index Name"] for node in nodes(plan) if "Index Name" in node}
+
+async def last_plan(connection, executed) -> dict:
+    """EXPLAIN of the last statement run, with the parameters it ran with"""
+    statement, parameters = executed[-1]
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    try:
+        plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar()
+    finally:
+        await connection.exec_driver_sql("SET LOCAL enable_seqscan = on")
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return plan[0]["Plan"]
+
+async def route_plan(client, connection, executed, path: str, **params) -> dict:
+    executed.clear()
+    response = await client.get(path, params=params)
+    assert response.status_code == 200
+    return await last_plan(connection, executed)
+
+async def indexes_used(client, connection, executed, path: str, **params) -> Set[str]:
+    """Indexes in the plan of the last statement the request ran"""
+    return index_names(await route_plan(client, connection, executed, path, **params))
+
+@pytest.fixture
+async def trainer_with_client(db):
+    trainer, member = await make_user(db, "trainer"), await make_user(db, "client")
+    await assign(db, member, await make_workouts(db, trainer, 3))
+    return trainer, member
+
+@pytest.mark.parametrize("cursor", [None, [1]])
+async def test_role_keyset_page_uses_role_index(db, connection, executed, cursor):
+    # The users listings' keyset query for a selective role; for clients, usually
+    # most of the table, walking the primary key index is as good
+    await make_user(db, "admin")
+    executed.clear()
+    await _user_page(db, select(User).where(User.role == "admin"), encode_cursor(cursor) if cursor else None, 50)
+    assert "ix_users_role_id" in index_names(await last_plan(connection, executed))
+
+@pytest.mark.parametrize("cursor", [None, [1]])
+async def test_client_listing_reads_in_index_order(client, connection, executed, cursor):
+    params = {"cursor": encode_cursor(cursor)} if cursor else {}
+    plan = await route_plan(client, connection, executed, "/api/users/clients", **params)
+    assert not {"Seq Scan", "Sort"} & {node["Node Type"] for node in nodes(plan)}
+
+@pytest.mark.parametrize("cursor", [None, [1]])
+async def test_trainer_workouts_use_trainer_index(client, connection, executed, trainer_with_client, cursor):
+    trainer, _ = trainer_with_client
+    params = {"user_id": trainer.id, **({"cursor": encode_cursor(cursor)} if cursor else {})}
+    assert "ix_workouts_trainer_id_id" in await indexes_used(client, connection, executed, "/api/workouts", **params)
+
+async def test_trainer_assignments_use_workout_index(client, connection, executed, trainer_with_client):
+    trainer, _ = trainer_with_client
+    used = await indexes_used(client, connection, executed, "/api/assignments", user_id=trainer.id)
+    assert {"ix_workouts_trainer_id_id", "ix_assignments_workout_id"} <= used
+
+@pytest.mark.parametrize("cursor", [None, ["2024-05-01", 1000]])
+async def test_client_progress_uses_client_date_index(client, connection, executed, trainer_with_client, cursor):
+    _, member = trainer_with_client
+    params = {"client_id": member.id, **({"cursor": encode_cursor(cursor)} if cursor else {})}
+    used = await indexes_used(client, connection, executed, "/api/progress", **params)
+    assert "ix_progress_logs_client_id_date_id" in used
+
+@pytest.mark.parametrize("cursor", [None, ["2024-05-01", 1000]])
+async def test_progress_feed_uses_date_index(client, connection, executed, cursor):
+    params = {"cursor": encode_cursor(cursor)} if cursor else {}
+    assert "ix_progress_logs_date_id" in await indexes_used(client, connection, executed, "/api/progress", **params)
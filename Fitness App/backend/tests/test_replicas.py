@@ -0,0 +1,88 @@
+"""
+Replica routing: healthy replicas in turn, the primary when none is usable or
+just after this client wrote
+"""
+import httpx
+import pytest
+from starlette.requests import Request
+from app.db import database
+from app.db.replicas import PRIMARY_COOKIE, ReadYourWritesMiddleware, ReplicaSet
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+async def replicas():
+    # Engines connect lazily, so these hosts are never contacted
+    replica_set = ReplicaSet([f"postgresql+asyncpg://replica-{name}/fitsphere" for name in "abc"], {}, max_lag=10.0)
+    yield replica_set
+    await replica_set.stop()
+
+async def test_replicas_are_used_in_turn(replicas):
+    chosen = [replicas.choose() for _ in range(6)]
+    assert chosen == replicas.replicas * 2
+
+async def test_unhealthy_replicas_are_skipped(replicas):
+    first, second, third = replicas.replicas
+    second.healthy = False
+    assert [replicas.choose() for _ in range(4)] == [first, third, third, first]
+
+async def test_no_healthy_replica_means_the_primary(replicas):
+    for replica in replicas.replicas:
+        replica.healthy = False
+    assert replicas.choose() is None
+    assert ReplicaSet([], {}, max_lag=10.0).choose() is None
+
+def request_with(cookies: str = "") -> Request:
+    headers = [(b"cookie", cookies.encode())] if cookies else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+async def read_session_engine(request: Request):
+    sessions = database.get_read_db(request)
+    db = await sessions.__anext__()
+    try:
+        return db.bind
+    finally:
+        await sessions.aclose()
+
+async def test_read_db_uses_a_replica(replicas, monkeypatch):
+    monkeypatch.setattr(database, "read_replicas", replicas)
+    assert await read_session_engine(request_with()) is replicas.replicas[0].engine
+    assert await read_session_engine(request_with()) is replicas.replicas[1].engine
+
+async def test_read_db_uses_the_primary_after_a_write(replicas, monkeypatch):
+    monkeypatch.setattr(database, "read_replicas", replicas)
+    assert await read_session_engine(request_with(f"{PRIMARY_COOKIE}=1")) is database.async_engine
+
+async def test_read_db_uses_the_primary_without_healthy_replicas(replicas, monkeypatch):
+    monkeypatch.setattr(database, "read_replicas", replicas)
+    for replica in replicas.replicas:
+        replica.healthy = False
+    assert await read_session_engine(request_with()) is database.async_engine
+
+async def test_one_server_for_every_session_of_a_request(replicas, monkeypatch):
+    monkeypatch.setattr(database, "read_replicas", replicas)
+    sessions = database.get_read_sessionmaker(request_with())
+    assert sessions is replicas.replicas[0].sessionmaker
+    assert database.get_read_sessionmaker(request_with(f"{PRIMARY_COOKIE}=1")) is database.AsyncSessionLocal
+
+async def endpoint(scope, receive, send):
+    status = int(scope["path"].strip("/"))
+    await send({"type": "http.response.start", "status": status, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+@pytest.mark.parametrize("method,status,sets_cookie", [
+    ("POST", 201, True),
+    ("PUT", 200, True),
+    ("DELETE", 204, True),
+    ("POST", 400, False),
+    ("PATCH", 500, False),
+    ("GET", 200, False),
+])
+async def test_cookie_only_on_successful_writes(method, status, sets_cookie):
+    transport = httpx.ASGITransport(app=ReadYourWritesMiddleware(endpoint, seconds=5))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        response = await http.request(method, f"/{status}")
+    assert response.status_code == status
+    assert (PRIMARY_COOKIE in response.cookies) is sets_cookie
+    if sets_cookie:
+        assert "Max-Age=5" in response.headers["set-cookie"]
@@ -0,0 +1,56 @@
+"""
+Incremental rollup refreshes leave the same rows a full recompute would
+"""
+from datetime import date
+import pytest
+from sqlalchemy import select
+from app.db.rollups import KEY_COLUMNS, PERIODS, VALUE_COLUMNS, rollup_query
+from app.models.models import ProgressLog, ProgressRollup
+from tests.factories import make_user
+
+pytestmark = pytest.mark.anyio
+
+async def stored_rollups(db, client_ids):
+    columns = [getattr(ProgressRollup, column) for column in KEY_COLUMNS + VALUE_COLUMNS]
+    query = select(*columns).where(ProgressRollup.client_id.in_(client_ids))
+    return sorted(tuple(row) for row in await db.execute(query))
+
+async def recomputed_rollups(db, client_ids):
+    rows = []
+    for period in PERIODS:
+        rows += [tuple(row) for row in await db.execute(
+            rollup_query(period).where(ProgressLog.client_id.in_(client_ids))
+        )]
+    return sorted(rows)
+
+async def test_rollups_match_a_full_recompute_after_mixed_writes(client, db):
+    first, second = await make_user(db, "client"), await make_user(db, "client")
+    await db.commit()
+    # 2024-01-01 is a Monday: the first four days share a week, the 10th starts the next
+    created = []
+    for day, weight in ((1, 80.0), (2, None), (3, 79.5), (10, 79.0)):
+        response = await client.post("/api/progress", json={
+            "client_id": first.id, "date": f"2024-01-{day:02d}", "weight": weight, "calories": 2000,
+        })
+        assert response.status_code == 201
+        created.append(response.json()["id"])
+
+    response = await client.post("/api/progress/bulk", json=[
+        {"client_id": first.id, "date": "2024-01-03", "weight": 78.0, "calories": 1800},  # update
+        {"client_id": first.id, "date": "2024-01-04", "weight": 77.5},                    # create
+        {"client_id": second.id, "date": "2024-01-03", "weight": 60.0, "calories": 1500},
+        {"client_id": second.id, "date": "2024-01-17", "calories": 1700},
+    ])
+    assert (response.json()["created"], response.json()["updated"]) == (3, 1)
+
+    # The 10th is alone in its week, so deleting it must drop that bucket too
+    for log_id in (created[0], created[3]):
+        assert (await client.delete(f"/api/progress/{log_id}")).status_code == 200
+
+    client_ids = [first.id, second.id]
+    stored = await stored_rollups(db, client_ids)
+    assert stored == await recomputed_rollups(db, client_ids)
+    assert {(row[1], row[2]) for row in stored if row[0] == first.id} == {
+        ("day", date(2024, 1, 2)), ("day", date(2024, 1, 3)), ("day", date(2024, 1, 4)),
+        ("week", date(2024, 1, 1)),
+    }
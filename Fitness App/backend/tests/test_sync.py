@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+import pytest
+from app.core.config import settings
+from app.core.pagination import decode_cursor_shapes
+from app.routes.sync import PAGED_TOKEN, TOKEN
+from tests.factories import make_logs, make_user, make_workouts
+
+pytestmark = pytest.mark.anyio
+
+async def test_trainer_full_sync_sends_only_the_newest_logs(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_LOG_LIMIT", 3)
+    trainer, member = await make_user(db, "trainer"), await make_user(db, "client")
+    # Far in the future, so they are the newest logs whatever else the database holds
+    days = [date(2999, 1, 1) + timedelta(days=offset) for offset in range(5)]
+    logs = await make_logs(db, member, days)
+
+    response = await client.get("/api/sync", params={"user_id": trainer.id})
+    assert response.status_code == 200
+    assert [row["id"] for row in response.json()["progress_logs"]] == [log.id for log in reversed(logs[-3:])]
+
+async def test_trainer_incremental_sync_is_not_capped(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_LOG_LIMIT", 1)
+    trainer, member = await make_user(db, "trainer"), await make_user(db, "client")
+    token = (await client.get("/api/sync", params={"user_id": trainer.id})).json()["sync_token"]
+    logs = await make_logs(db, member, [date(2999, 1, 1), date(2999, 1, 2)])
+
+    response = await client.get("/api/sync", params={"user_id": trainer.id, "since": token})
+    synced = {row["id"] for row in response.json()["progress_logs"]}
+    assert {log.id for log in logs} <= synced
+
+async def test_client_full_sync_sends_all_own_logs(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "DASHBOARD_LOG_LIMIT", 1)
+    member = await make_user(db, "client")
+    logs = await make_logs(db, member, [date(2024, 1, day) for day in range(1, 4)])
+
+    response = await client.get("/api/sync", params={"user_id": member.id})
+    assert [row["id"] for row in response.json()["progress_logs"]] == [log.id for log in logs]
+
+async def sync_all(client, user_id, token):
+    """Every page of an incremental sync, following has_more"""
+    pages = []
+    while True:
+        page = (await client.get("/api/sync", params={"user_id": user_id, "since": token})).json()
+        pages.append(page)
+        token = page["sync_token"]
+        if not page["has_more"]:
+            return pages
+
+async def test_incremental_sync_is_paged(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_PAGE_SIZE", 2)
+    member = await make_user(db, "client")
+    token = (await client.get("/api/sync", params={"user_id": member.id})).json()["sync_token"]
+    logs = await make_logs(db, member, [date(2024, 1, day) for day in range(1, 8)])
+    for log in logs[:3]:
+        await db.delete(log)
+    await db.flush()
+
+    pages = await sync_all(client, member.id, token)
+    assert [len(page["progress_logs"]) for page in pages] == [2, 2]
+    assert [len(page["deleted"]["progress_logs"]) for page in pages] == [2, 1]
+    assert [log["id"] for page in pages for log in page["progress_logs"]] == [log.id for log in logs[3:]]
+    assert [row_id for page in pages for row_id in page["deleted"]["progress_logs"]] == [log.id for log in logs[:3]]
+    assert [page["has_more"] for page in pages] == [True, False]
+    # The last page hands out a plain token, for the horizon taken on the first page
+    floor, horizon, _, _ = decode_cursor_shapes(pages[0]["sync_token"], PAGED_TOKEN)
+    assert decode_cursor_shapes(pages[-1]["sync_token"], TOKEN) == [horizon]
+    assert floor == decode_cursor_shapes(token, TOKEN)[0]
+
+async def test_paged_sync_sends_workouts_only_on_the_first_page(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_PAGE_SIZE", 1)
+    trainer, member = await make_user(db, "trainer"), await make_user(db, "client")
+    token = (await client.get("/api/sync", params={"user_id": trainer.id})).json()["sync_token"]
+    workouts = await make_workouts(db, trainer, 2)
+    await make_logs(db, member, [date(2999, 1, 1), date(2999, 1, 2)])
+
+    pages = await sync_all(client, trainer.id, token)
+    assert len(pages) >= 2
+    assert [row["id"] for row in pages[0]["workouts"]] == [workout.id for workout in workouts]
+    assert all(page["workouts"] == [] and page["assignments"] == [] for page in pages[1:])
+    assert all(len(page["progress_logs"]) <= 1 for page in pages)
+
+@pytest.mark.parametrize("token", ["WzEsMl0", "WzEsMiwzLCJ4Il0", "bm90IGpzb24"])
+async def test_malformed_sync_tokens_are_rejected(client, db, token):
+    member = await make_user(db, "client")
+    response = await client.get("/api/sync", params={"user_id": member.id, "since": token})
+    assert response.status_code == 400
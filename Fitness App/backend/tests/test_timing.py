@@ -0,0 +1,84 @@
+"""
+Server-Timing and query budgets, from a bare ASGI app and through the API
+"""
+import asyncio
+import logging
+import re
+from datetime import date
+import httpx
+import pytest
+from sqlalchemy import event
+from app.core import metrics, timing
+from app.core.config import settings
+from app.db import pool
+from tests.factories import make_logs, make_user
+
+pytestmark = pytest.mark.anyio
+
+SERVER_TIMING = re.compile(r'^db;dur=(\d+\.\d);desc="(\d+) queries", app;dur=(\d+\.\d)$')
+
+async def query():
+    timing.record_query(0.005)
+
+async def querying_app(scope, receive, send):
+    """Two 5 ms "queries", one of them in a task the request spawned"""
+    await query()
+    await asyncio.create_task(query())
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def call(app, path="/"):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        return await http.get(path)
+
+async def test_server_timing_counts_the_requests_queries():
+    response = await call(timing.RequestTimingMiddleware(querying_app))
+    db_ms, queries, _ = SERVER_TIMING.match(response.headers["server-timing"]).groups()
+    assert (db_ms, queries) == ("10.0", "2")
+
+async def test_server_timing_header_can_be_turned_off():
+    response = await call(timing.RequestTimingMiddleware(querying_app, header=False))
+    assert "server-timing" not in response.headers
+
+async def test_query_budget_warns(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "QUERY_BUDGET", 1)
+    exceeded = metrics.counter("db.query_budget_exceeded")
+    before = exceeded.value
+    with caplog.at_level(logging.WARNING, logger=timing.__name__):
+        response = await call(timing.RequestTimingMiddleware(querying_app), "/report")
+    assert response.status_code == 200
+    assert "GET /report ran 2 queries, over its budget of 1" in caplog.text
+    assert exceeded.value == before + 1
+
+async def test_query_budget_per_route_and_strict(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_BUDGET", 1)
+    monkeypatch.setattr(settings, "QUERY_BUDGETS", {"GET /bulk": None, "GET /tight": 0})
+    monkeypatch.setattr(settings, "QUERY_BUDGET_STRICT", True)
+    app = timing.RequestTimingMiddleware(querying_app)
+    assert (await call(app, "/bulk")).status_code == 200
+    with pytest.raises(timing.QueryBudgetExceeded, match="GET /tight ran 2 queries"):
+        await call(app, "/tight")
+
+@pytest.fixture
+def instrumented(engine):
+    """The test engine reporting its statements like the app's engines"""
+    pool.instrument_engine(engine.sync_engine)
+    yield
+    event.remove(engine.sync_engine, "handle_error", pool._on_error)
+    event.remove(engine.sync_engine, "before_cursor_execute", pool._before_execute)
+    event.remove(engine.sync_engine, "after_cursor_execute", pool._after_execute)
+
+async def test_api_reports_its_queries_and_route_budget(client, db, instrumented, monkeypatch):
+    member = await make_user(db, "client")
+    await make_logs(db, member, [date(2024, 5, 1)])
+    listing = {"client_id": member.id}
+    monkeypatch.setattr(settings, "QUERY_BUDGETS", {"GET /api/progress": 0})
+    monkeypatch.setattr(settings, "QUERY_BUDGET_STRICT", True)
+
+    with pytest.raises(timing.QueryBudgetExceeded, match="GET /api/progress ran 1 queries"):
+        await client.get("/api/progress", params=listing)
+
+    monkeypatch.setattr(settings, "QUERY_BUDGETS", {})
+    response = await client.get("/api/progress", params=listing)
+    assert response.status_code == 200
+    assert SERVER_TIMING.match(response.headers["server-timing"]).group(2) == "1"
@@ -2,8 +2,14 @@ import axios from 'axios'
 
 const API_BASE_URL = 'http://localhost:8000'
 
+// Set VITE_READ_YOUR_WRITES=true (e.g. in .env.local) when the API runs with
+// READ_REPLICA_URLS: requests then carry the cookie that pins reads to the
+// primary database right after a write. The API's CORS_ORIGINS must list this origin.
+const READ_YOUR_WRITES = import.meta.env.VITE_READ_YOUR_WRITES === 'true'
+
 const api = axios.create({
   baseURL: API_BASE_URL,
+  withCredentials: READ_YOUR_WRITES,
   headers: {
     'Content-Type': 'application/json',
   },
@@ -37,6 +43,18 @@ api.interceptors.response.use(
   }
 )
 
+// List endpoints are cursor-paginated - follow next_cursor until the last page
+const getAllPages = async (url, params = {}) => {
+  const items = []
+  let cursor = null
+  do {
+    const response = await api.get(url, { params: { ...params, cursor, limit: 500 } })
+    items.push(...response.data.items)
+    cursor = response.data.next_cursor
+  } while (cursor)
+  return items
+}
+
 // Auth API
 export const login = async (email, password) => {
   try {
@@ -60,18 +78,20 @@ export const register = async (name, email, password, role = 'client') => {
 
 // Health Tips API
 export const getHealthTips = async () => {
-  const response = await api.get('/api/health-tips')
-  return response.data
+  return getAllPages('/api/health-tips')
 }
 
 // Workouts API
 export const getMyWorkouts = async (userId) => {
-  const response = await api.get(`/api/workouts?user_id=${userId}`)
-  return response.data
+  return getAllPages('/api/workouts', { user_id: userId })
 }
 
 export const getMyCreatedWorkouts = async (userId) => {
-  const response = await api.get(`/api/workouts?user_id=${userId}`)
+  return getAllPages('/api/workouts', { user_id: userId })
+}
+
+export const searchWorkouts = async (query, userId) => {
+  const response = await api.get('/api/workouts/search', { params: { q: query, user_id: userId } })
   return response.data
 }
 
@@ -92,8 +112,7 @@ export const deleteWorkout = async (id, trainerId) => {
 
 // Progress Logs API
 export const getMyProgressLogs = async (userId) => {
-  const response = await api.get(`/api/progress?client_id=${userId}`)
-  return response.data
+  return getAllPages('/api/progress', { client_id: userId })
 }
 
 export const addProgressLog = async (data, userId) => {
@@ -108,14 +127,12 @@ export const deleteProgressLog = async (id) => {
 
 // Clients API (Trainer)
 export const getClients = async () => {
-  const response = await api.get('/api/users/clients')
-  return response.data
+  return getAllPages('/api/users/clients')
 }
 
 // Assignments API
 export const getAssignments = async (userId) => {
-  const response = await api.get(`/api/assignments?user_id=${userId}`)
-  return response.data
+  return getAllPages('/api/assignments', { user_id: userId })
 }
 
 export const assignWorkout = async (clientId, workoutId) => {
@@ -128,5 +145,54 @@ export const removeAssignment = async (id) => {
   return response.data
 }
 
+// Dashboard API - one request per dashboard view
+export const getTrainerDashboard = async (userId) => {
+  const response = await api.get(`/api/dashboard/trainer/${userId}`)
+  return response.data
+}
+
+export const getClientDashboard = async (userId) => {
+  const response = await api.get(`/api/dashboard/client/${userId}`)
+  return response.data
+}
+
+// Sync API - only what changed since the token from the last dashboard or sync call
+const SYNCED_LISTS = ['workouts', 'assignments', 'progress_logs']
+
+// A large delta arrives in pages (has_more); fold them into one, in order, so a
+// row changed on one page and deleted on a later one ends up deleted
+export const getChanges = async (userId, since) => {
+  let page = (await api.get('/api/sync', { params: { user_id: userId, since } })).data
+  const changes = page
+  while (page.has_more) {
+    page = (await api.get('/api/sync', { params: { user_id: userId, since: page.sync_token } })).data
+    SYNCED_LISTS.forEach((list) => {
+      const deleted = new Set(page.deleted[list])
+      changes[list] = changes[list].filter((row) => !deleted.has(row.id)).concat(page[list])
+      changes.deleted[list] = changes.deleted[list].concat(page.deleted[list])
+    })
+    changes.sync_token = page.sync_token
+  }
+  return changes
+}
+
+// Apply a sync delta to a list: drop deleted ids first, then upsert changed rows by id
+export const mergeChanges = (items, changed, deletedIds, compare) => {
+  const deleted = new Set(deletedIds)
+  const rows = new Map(items.filter((item) => !deleted.has(item.id)).map((item) => [item.id, item]))
+  changed.forEach((item) => rows.set(item.id, item))
+  return [...rows.values()].sort(compare)
+}
+
+// Server-sent change notifications; returns a function that closes the stream
+export const subscribeToChanges = (userId, onEvent) => {
+  const source = new EventSource(`${API_BASE_URL}/api/events/${userId}`)
+  source.onmessage = (message) => onEvent(JSON.parse(message.data))
+  return () => source.close()
+}
+
+export const byId = (a, b) => a.id - b.id
+export const newestFirst = (a, b) => b.date.localeCompare(a.date) || b.id - a.id
+
 export default api
 
@@ -1,6 +1,15 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useAuth } from '../context/AuthContext'
-import { getMyWorkouts, getMyProgressLogs, addProgressLog, deleteProgressLog } from '../api/api'
+import {
+  getClientDashboard,
+  getChanges,
+  subscribeToChanges,
+  mergeChanges,
+  byId,
+  newestFirst,
+  addProgressLog,
+  deleteProgressLog
+} from '../api/api'
 import "../cssfiles/ClientDashboard.css";
 import Modal from '../components/Modal'
 
@@ -9,6 +18,7 @@ function ClientDashboard() {
   const [workouts, setWorkouts] = useState([])
   const [progressLogs, setProgressLogs] = useState([])
   const [loading, setLoading] = useState(true)
+  const syncToken = useRef(null)
   const [showAddLogModal, setShowAddLogModal] = useState(false)
   const [formData, setFormData] = useState({
     date: new Date().toISOString().split('T')[0],
@@ -24,17 +34,27 @@ function ClientDashboard() {
     }
   }, [user])
 
+  // Live updates: each notification pulls the delta, "resync" reloads everything
+  useEffect(() => {
+    if (!user?.id) return
+    return subscribeToChanges(user.id, (event) => {
+      if (event.type === 'resync') {
+        fetchData()
+      } else {
+        refreshChanges()
+      }
+    })
+  }, [user])
+
   const fetchData = async () => {
     if (!user?.id) return
     
     try {
       setLoading(true)
-      const [workoutsData, logsData] = await Promise.all([
-        getMyWorkouts(user.id),
-        getMyProgressLogs(user.id)
-      ])
-      setWorkouts(workoutsData)
-      setProgressLogs(logsData)
+      const dashboard = await getClientDashboard(user.id)
+      syncToken.current = dashboard.sync_token
+      setWorkouts(dashboard.workouts)
+      setProgressLogs(dashboard.progress_logs)
     } catch (error) {
       console.error('Error fetching data:', error)
     } finally {
@@ -42,6 +62,18 @@ function ClientDashboard() {
     }
   }
 
+  // After a change, pull only what changed since the last load
+  const refreshChanges = async () => {
+    try {
+      const changes = await getChanges(user.id, syncToken.current)
+      syncToken.current = changes.sync_token
+      setWorkouts((current) => mergeChanges(current, changes.workouts, changes.deleted.workouts, byId))
+      setProgressLogs((current) => mergeChanges(current, changes.progress_logs, changes.deleted.progress_logs, newestFirst))
+    } catch (error) {
+      console.error('Error refreshing data:', error)
+    }
+  }
+
   const handleAddLog = async (e) => {
     e.preventDefault()
     setSubmitting(true)
@@ -56,7 +88,7 @@ function ClientDashboard() {
       }
 
       await addProgressLog(logData, user.id)
-      await fetchData()
+      await refreshChanges()
       setShowAddLogModal(false)
       setFormData({
         date: new Date().toISOString().split('T')[0],
@@ -79,7 +111,7 @@ function ClientDashboard() {
 
     try {
       await deleteProgressLog(id)
-      await fetchData()
+      await refreshChanges()
     } catch (error) {
       console.error('Error deleting progress log:', error)
       alert('Failed to delete progress log. Please try again.')
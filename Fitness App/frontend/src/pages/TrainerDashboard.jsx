@@ -1,16 +1,18 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useAuth } from '../context/AuthContext'
 import "../cssfiles/TrainerDashboard.css";
 import {
-  getClients,
-  getMyCreatedWorkouts,
+  getTrainerDashboard,
+  getChanges,
+  subscribeToChanges,
+  mergeChanges,
+  byId,
+  newestFirst,
   createWorkout,
   updateWorkout,
   deleteWorkout,
-  getAssignments,
   assignWorkout,
-  removeAssignment,
-  getMyProgressLogs
+  removeAssignment
 } from '../api/api'
 import Modal from '../components/Modal'
 
@@ -21,6 +23,7 @@ function TrainerDashboard() {
   const [assignments, setAssignments] = useState([])
   const [progressLogs, setProgressLogs] = useState([])
   const [loading, setLoading] = useState(true)
+  const syncToken = useRef(null)
   const [showWorkoutModal, setShowWorkoutModal] = useState(false)
   const [showAssignModal, setShowAssignModal] = useState(false)
   const [editingWorkout, setEditingWorkout] = useState(null)
@@ -34,21 +37,29 @@ function TrainerDashboard() {
     }
   }, [user])
 
+  // Live updates: each notification pulls the delta, "resync" reloads everything
+  useEffect(() => {
+    if (!user?.id) return
+    return subscribeToChanges(user.id, (event) => {
+      if (event.type === 'resync') {
+        fetchData()
+      } else {
+        refreshChanges()
+      }
+    })
+  }, [user])
+
   const fetchData = async () => {
     if (!user?.id) return
     
     try {
       setLoading(true)
-      const [clientsData, workoutsData, assignmentsData, logsData] = await Promise.all([
-        getClients(),
-        getMyCreatedWorkouts(user.id),
-        getAssignments(user.id),
-        getMyProgressLogs()
-      ])
-      setClients(clientsData)
-      setWorkouts(workoutsData)
-      setAssignments(assignmentsData)
-      setProgressLogs(logsData)
+      const dashboard = await getTrainerDashboard(user.id)
+      syncToken.current = dashboard.sync_token
+      setClients(dashboard.clients)
+      setWorkouts(dashboard.workouts)
+      setAssignments(dashboard.assignments)
+      setProgressLogs(dashboard.progress_logs)
     } catch (error) {
       console.error('Error fetching data:', error)
     } finally {
@@ -56,6 +67,22 @@ function TrainerDashboard() {
     }
   }
 
+  // After a change, pull only what changed since the last load
+  const refreshChanges = async () => {
+    try {
+      const changes = await getChanges(user.id, syncToken.current)
+      syncToken.current = changes.sync_token
+      setWorkouts((current) => mergeChanges(current, changes.workouts, changes.deleted.workouts, byId))
+      setAssignments((current) => mergeChanges(current, changes.assignments, changes.deleted.assignments, byId))
+      // The dashboard only loads the newest logs (DASHBOARD_LOG_LIMIT), but a delta
+      // carries every changed log, older ones included: those are merged into place,
+      // so the list can grow past the cap until the next full load
+      setProgressLogs((current) => mergeChanges(current, changes.progress_logs, changes.deleted.progress_logs, newestFirst))
+    } catch (error) {
+      console.error('Error refreshing data:', error)
+    }
+  }
+
   const handleCreateWorkout = async (e) => {
     e.preventDefault()
     setSubmitting(true)
@@ -66,7 +93,7 @@ function TrainerDashboard() {
       } else {
         await createWorkout(workoutForm, user.id)
       }
-      await fetchData()
+      await refreshChanges()
       setShowWorkoutModal(false)
       setEditingWorkout(null)
       setWorkoutForm({ title: '', description: '' })
@@ -91,7 +118,7 @@ function TrainerDashboard() {
 
     try {
       await deleteWorkout(id, user.id)
-      await fetchData()
+      await refreshChanges()
     } catch (error) {
       console.error('Error deleting workout:', error)
       alert('Failed to delete workout. Please try again.')
@@ -104,7 +131,7 @@ function TrainerDashboard() {
 
     try {
       await assignWorkout(parseInt(assignForm.clientId), parseInt(assignForm.workoutId))
-      await fetchData()
+      await refreshChanges()
       setShowAssignModal(false)
       setAssignForm({ clientId: '', workoutId: '' })
     } catch (error) {
@@ -122,7 +149,7 @@ function TrainerDashboard() {
 
     try {
       await removeAssignment(id)
-      await fetchData()
+      await refreshChanges()
     } catch (error) {
       console.error('Error removing assignment:', error)
       alert('Failed to remove assignment. Please try again.')